@@ -2,15 +2,64 @@
 
 Public API:
 - parse_code(code: str, language: str='python') -> dict
+- enable_cache / disable_cache / clear_cache / cache_stats: optional parse cache
+- parse_incremental(doc_id, code) -> (dict, changes): re-parse an edited document
 
 This package is designed to be easily extended with additional language parsers
 using the registry in `registry.py`.
 """
+import os
+from typing import TYPE_CHECKING
+
 from .registry import registry
 # Import language implementations so they register themselves on package import
 from . import python_parser  # noqa: F401
 
-__all__ = ["parse_code", "registry", "run_code", "run_file"]
+if TYPE_CHECKING:
+    from .cache import ParseCache
+
+__all__ = [
+    "cache_stats",
+    "clear_cache",
+    "disable_cache",
+    "enable_cache",
+    "parse_code",
+    "parse_incremental",
+    "registry",
+    "run_code",
+    "run_file",
+]
+
+# Parse cache; disabled until enable_cache() is called
+_cache = None
+# Remembered documents for parse_incremental(); created on first use
+_incremental = None
+
+
+def enable_cache(max_entries: int = 256, disk_dir: str = None) -> "ParseCache":
+    """Turn on the parse cache (in-memory LRU, plus an on-disk store if `disk_dir` is given)."""
+    global _cache
+    # Imported here so plain parsing never pays for hashlib/json
+    from .cache import ParseCache
+    _cache = ParseCache(max_entries=max_entries, disk_dir=disk_dir)
+    return _cache
+
+
+def disable_cache() -> None:
+    """Turn the parse cache off. On-disk entries are kept."""
+    global _cache
+    _cache = None
+
+
+def clear_cache() -> None:
+    """Drop all cached parse results, including the on-disk store."""
+    if _cache is not None:
+        _cache.clear()
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the parse cache, or None if it is disabled."""
+    return _cache.stats() if _cache is not None else None
 
 
 def run_code(code: str, language: str = "python") -> dict:
@@ -28,20 +77,72 @@ def run_file(path: str, language: str = "python") -> dict:
     This helper lets you pass a file path as a variable inside your code
     (no CLI involved). Example:
         ast = run_file("/path/to/script.py")
+
+    With the cache enabled, a file whose mtime and size are unchanged is
+    served without being read or hashed.
     """
+    cache = _cache
+    if cache is None:
+        with open(path, "r", encoding="utf-8") as fh:
+            code = fh.read()
+        return run_code(code, language)
+
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    tree = cache.get_file(path, language, st)
+    if tree is not None:
+        return tree
     with open(path, "r", encoding="utf-8") as fh:
         code = fh.read()
-    return run_code(code, language)
+    tree, key = _parse_cached(cache, code, language)
+    cache.record_file(path, language, st, key)
+    return tree
 
 
 def parse_code(code: str, language: str = "python") -> dict:
     """Parse code for a given language and return a serializable compact AST dict.
 
-    Parsers MUST return the compact representation by default.
+    Parsers MUST return the compact representation by default. When the parse
+    cache is enabled (see `enable_cache`) unchanged code is not re-parsed.
 
     Raises ValueError if no parser is registered for the requested language.
     """
+    cache = _cache
+    if cache is not None:
+        return _parse_cached(cache, code, language)[0]
+    return _get_parser(language).parse(code)
+
+
+def parse_incremental(doc_id: str, code: str, language: str = "python"):
+    """Parse the latest version of document `doc_id` and return (compact AST, changes).
+
+    Only top-level statements that changed since the previous version are
+    compacted again; `changes` lists the inserted, removed and changed ones
+    (see `incremental.IncrementalParser`). Only Python is supported.
+    """
+    global _incremental
+    if language.lower() != "python":
+        raise ValueError(f"Incremental parsing is not supported for language '{language}'")
+    if _incremental is None:
+        # Imported here so plain parsing never pays for difflib
+        from .incremental import IncrementalParser
+        _incremental = IncrementalParser()
+    return _incremental.parse(doc_id, code)
+
+
+def _get_parser(language: str):
     parser = registry.get(language)
     if parser is None:
         raise ValueError(f"No parser registered for language '{language}'")
-    return parser.parse(code)
+    return parser
+
+
+def _parse_cached(cache: "ParseCache", code: str, language: str):
+    """Parse through `cache`; returns (tree, cache key)."""
+    parser = _get_parser(language)
+    key = cache.make_key(language, getattr(parser, "version", "0"), code)
+    tree = cache.get(key)
+    if tree is None:
+        tree = parser.parse(code)
+        cache.put(key, tree)
+    return tree, key
@@ -5,8 +5,13 @@ class Parser(ABC):
     """Abstract parser interface. Subclasses must implement parse(code) -> dict.
 
     Parsers MUST return the compact AST representation by default.
+
+    `version` identifies the output format for caching; bump it whenever the
+    compact representation produced by a parser changes.
     """
 
+    version = "1"
+
     @abstractmethod
     def parse(self, code: str) -> dict:
         raise NotImplementedError
@@ -0,0 +1,82 @@
+"""Parallel multi-file parsing for the CLI batch mode.
+
+Files are discovered lazily from directories and glob patterns and fanned out
+over a process pool. Each worker reads, parses and serializes its own file, and
+results are yielded as soon as they finish. Only a bounded number of files are
+in flight at once, so memory stays flat on repositories of any size.
+"""
+import glob
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from . import run_file
+
+# File extensions picked up when a directory is given, per language
+EXTENSIONS = {"python": (".py",)}
+
+
+def iter_files(patterns, language="python"):
+    """Yield source files matching `patterns` (files, directories or globs), each once."""
+    extensions = EXTENSIONS.get(language.lower(), ())
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = (
+                os.path.join(root, name)
+                for root, dirs, files in os.walk(pattern)
+                for name in sorted(files)
+                if name.endswith(extensions)
+            )
+        elif glob.has_magic(pattern):
+            candidates = glob.iglob(pattern, recursive=True)
+        else:
+            candidates = [pattern]
+        for path in candidates:
+            if os.path.isdir(path):
+                continue
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+def parse_file_to_json(path, language="python"):
+    """Parse one file and return its result as a compact JSON line (no newline).
+
+    Errors are reported in the result rather than raised.
+    """
+    try:
+        result = {"path": path, "language": language, "ast": run_file(path, language)}
+        return json.dumps(result, separators=(",", ":"))
+    except Exception as e:
+        result = {"path": path, "language": language, "error": f"{type(e).__name__}: {e}"}
+        return json.dumps(result, separators=(",", ":"))
+
+
+def parse_files(paths, language="python", workers=None, max_pending=None):
+    """Parse `paths` on a process pool, yielding JSON lines in completion order.
+
+    At most `max_pending` files (default: 4 per worker) are submitted at a
+    time, so `paths` may be an arbitrarily long lazy iterator.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    paths = iter(paths)
+
+    if workers == 1:
+        for path in paths:
+            yield parse_file_to_json(path, language)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(parse_file_to_json, path, language))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,137 @@
+"""Optional cache for parse results.
+
+Entries are keyed by (language, parser version, SHA-256 of the source), so a
+parser upgrade or a different Python version never serves stale trees. The
+cache keeps compact ASTs as JSON text: an in-memory LRU in front of an optional
+on-disk store, and every hit decodes a fresh tree so callers may mutate it.
+
+Files are additionally indexed by (path, language) -> (mtime, size, key), which
+lets `run_file` skip reading and hashing a file that has not changed.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class ParseCache:
+    def __init__(self, max_entries=256, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.file_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(language, parser_version, code):
+        h = hashlib.sha256()
+        h.update(f"{language.lower()}\0{parser_version}\0".encode("utf-8"))
+        h.update(code.encode("utf-8"))
+        return h.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return a freshly decoded tree for `key`, or None on a miss."""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+        if text is None and self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as fh:
+                    text = fh.read()
+            except OSError:
+                text = None
+            if text is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                self._remember(key, text)
+        if text is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return json.loads(text)
+
+    def put(self, key, tree):
+        """Store `tree`; trees that are not JSON-serializable are silently not cached."""
+        try:
+            text = json.dumps(tree, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        self._remember(key, text)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, path)
+
+    def get_file(self, path, language, stat):
+        """Return the tree for a file whose mtime and size are unchanged, or None.
+
+        A hit here means the file was neither read nor hashed.
+        """
+        with self._lock:
+            entry = self._files.get((path, language.lower()))
+        if not entry or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        tree = self.get(entry[2])
+        if tree is not None:
+            with self._lock:
+                self.file_hits += 1
+        return tree
+
+    def record_file(self, path, language, stat, key):
+        with self._lock:
+            self._files[(path, language.lower())] = (stat.st_mtime_ns, stat.st_size, key)
+            self._files.move_to_end((path, language.lower()))
+            while len(self._files) > self.max_entries:
+                self._files.popitem(last=False)
+
+    def clear(self):
+        """Drop every in-memory and on-disk entry and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._files.clear()
+            self.hits = self.disk_hits = self.file_hits = self.misses = 0
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for root, _dirs, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith(".json"):
+                        try:
+                            os.remove(os.path.join(root, name))
+                        except OSError:
+                            pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "file_hits": self.file_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_dir": self.disk_dir,
+            }
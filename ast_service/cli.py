@@ -1,8 +1,9 @@
 """CLI for the AST service."""
 import argparse
-import json
+import os
 import sys
 from . import parse_code
+from .encoding import FORMATS, dumps, write
 
 
 def run_code(code: str, language: str = "python") -> dict:
@@ -16,8 +17,21 @@ def main(argv=None):
     parser.add_argument("--language", "-l", default="python", help="Language to parse (default: python)")
     parser.add_argument("--file", "-f", help="Path to source file; if omitted reads stdin")
     parser.add_argument("--code", "-c", help="Code snippet to parse directly (takes precedence over --file and stdin)")
+    parser.add_argument("--batch", "-b", nargs="+", metavar="PATH",
+                        help="Parse many files (paths, directories or globs); prints one JSON object per line")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output encoding of a single AST (default: json, indented); --batch always writes JSON lines")
+    parser.add_argument("--output", "-o", help="Write the AST to this file instead of stdout")
     args = parser.parse_args(argv)
 
+    if args.batch:
+        from .batch import iter_files, parse_files
+        for line in parse_files(iter_files(args.batch, args.language), args.language, workers=args.jobs):
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        return
+
     if args.code is not None:
         code = args.code
     elif args.file:
@@ -27,7 +41,29 @@ def main(argv=None):
         code = sys.stdin.read()
 
     ast_obj = run_code(code, args.language)
-    print(json.dumps(ast_obj, indent=2))
+    if args.output:
+        # Encoded into a temp file renamed into place, so a failed encode leaves no partial output
+        tmp = f"{args.output}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                write(ast_obj, fh, args.format)
+            os.replace(tmp, args.output)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        # stdout replaced by a text-only stream, e.g. contextlib.redirect_stdout(io.StringIO())
+        if args.format == "binary":
+            parser.error("binary output needs a byte stream; use --output")
+        sys.stdout.write(dumps(ast_obj, args.format).decode("ascii") + "\n")
+        return
+    sys.stdout.flush()
+    write(ast_obj, out, args.format)
+    if args.format != "binary":
+        out.write(b"\n")
+    out.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,375 @@
+"""Output encodings for compact ASTs, written as a stream.
+
+Formats:
+
+- "json": indented JSON, byte-for-byte what ``json.dumps(tree, indent=2)`` gives
+- "min": JSON without whitespace
+- "interned": JSON in which every node is an array ``[shape, value, ...]``;
+  a shape lists a node type and its field names once, in the ``shapes``
+  table, instead of repeating them in every node. Lists are ``[0, item, ...]``.
+- "binary": a tagged binary encoding with varint integers, in which node
+  shapes and strings are written once and referred to by index afterwards.
+
+`write` walks the tree with an explicit stack and hands the output to the file
+object in chunks as it goes, so the encoded document is never held in memory
+as a whole and nesting depth is not bounded by the recursion limit. Shape and
+string tables are built during the walk: the interned JSON writes its table
+after the tree, and the binary format defines each entry inline at its first
+use. `loads` reads any of the formats back; the JSON ones go through
+`json.loads`, which is limited by the recursion depth, the binary one is not.
+"""
+import io
+import json
+import struct
+from json.encoder import encode_basestring_ascii
+
+FORMATS = ("json", "min", "interned", "binary")
+
+BINARY_MAGIC = b"CAST\x01"
+INTERNED_VERSION = 1
+
+# Binary tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _STR_REF, _BYTES, _LIST, _NODE, _SHAPE = range(11)
+
+_END = object()
+_SMALL = [bytes((i,)) for i in range(128)]
+_TAG = [bytes((i,)) for i in range(11)]
+# Whole statements (depth 2: Module -> body -> statement) of minified JSON go through the C encoder
+_MIN_DUMP_DEPTH = 2
+_min_encode = json.JSONEncoder(separators=(",", ":")).encode
+_pack_float = struct.Struct("<d").pack
+_unpack_float = struct.Struct("<d").unpack_from
+
+
+class _Sink:
+    """Buffers small writes and passes them on to `fp` about every `chunk_size` characters or bytes."""
+
+    def __init__(self, fp, chunk_size, text):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text = text
+        self.parts = []
+        self.size = 0
+        self.written = 0
+
+    def write(self, part):
+        self.parts.append(part)
+        self.size += len(part)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        data = "".join(self.parts).encode("ascii") if self.text else b"".join(self.parts)
+        self.fp.write(data)
+        self.written += len(data)
+        self.parts = []
+        self.size = 0
+
+
+def _shape_of(node):
+    """(type or None, field names) of dict `node`, and its field values in the same order."""
+    keys = tuple(node)
+    if keys and keys[0] == "type" and isinstance(node["type"], str):
+        return (node["type"], keys[1:]), list(node.values())[1:]
+    return (None, keys), list(node.values())
+
+
+def _json_scalar(value):
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return json.dumps(value)
+    if isinstance(value, dict):
+        return "{}"
+    if isinstance(value, list):
+        return "[]"
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_json(tree, write, indent=None, shapes=None, dump_depth=None):
+    """Write `tree` as JSON; with a `shapes` dict, nodes and lists are written in interned form.
+
+    Minified containers at `dump_depth` are encoded in one call to the C
+    encoder, unless they are nested too deeply for it.
+    """
+    key_sep = ": " if indent is not None else ":"
+    stack = []  # [iterator, is_dict, first]
+    value = tree
+    while True:
+        chunk = None
+        if len(stack) == dump_depth and isinstance(value, (dict, list)):
+            try:
+                chunk = _min_encode(value)
+            except RecursionError:
+                pass
+        if chunk is not None:
+            write(chunk)
+        elif shapes is not None and isinstance(value, (dict, list)):
+            if isinstance(value, dict):
+                shape, values = _shape_of(value)
+                idx = shapes.get(shape)
+                if idx is None:
+                    idx = shapes[shape] = len(shapes) + 1
+                write(f"[{idx}")
+                stack.append([iter(values), False, False])
+            else:
+                write("[0")
+                stack.append([iter(value), False, False])
+        elif isinstance(value, dict) and value:
+            write("{")
+            stack.append([iter(value.items()), True, True])
+        elif isinstance(value, list) and value:
+            write("[")
+            stack.append([iter(value), False, True])
+        else:
+            write(_json_scalar(value))
+
+        while stack:
+            frame = stack[-1]
+            item = next(frame[0], _END)
+            if item is _END:
+                stack.pop()
+                close = "}" if frame[1] else "]"
+                write(close if indent is None else "\n" + " " * (indent * len(stack)) + close)
+                continue
+            sep = "" if frame[2] else ","
+            frame[2] = False
+            if indent is not None:
+                sep += "\n" + " " * (indent * len(stack))
+            if frame[1]:
+                key, value = item
+                if not isinstance(key, str):
+                    raise TypeError(f"keys must be str, not {type(key).__name__}")
+                write(sep + encode_basestring_ascii(key) + key_sep)
+            else:
+                value = item
+                write(sep)
+            break
+        else:
+            return
+
+
+def _varint(n):
+    if n < 0x80:
+        return _SMALL[n]
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _write_binary(tree, write):
+    write(BINARY_MAGIC)
+    strings = {}
+    shapes = {}
+
+    def write_str(s):
+        idx = strings.get(s)
+        if idx is None:
+            strings[s] = len(strings)
+            data = s.encode("utf-8", "surrogatepass")
+            write(_TAG[_STR] + _varint(len(data)) + data)
+        else:
+            write(_TAG[_STR_REF] + _varint(idx))
+
+    stack = [tree]
+    pop = stack.pop
+    while stack:
+        value = pop()
+        if isinstance(value, str):
+            write_str(value)
+        elif isinstance(value, dict):
+            shape, values = _shape_of(value)
+            idx = shapes.get(shape)
+            if idx is None:
+                shapes[shape] = len(shapes)
+                type_name, fields = shape
+                write(_TAG[_SHAPE])
+                if type_name is None:
+                    write(_TAG[_NONE])
+                else:
+                    write_str(type_name)
+                write(_varint(len(fields)))
+                for field in fields:
+                    if not isinstance(field, str):
+                        raise TypeError(f"keys must be str, not {type(field).__name__}")
+                    write_str(field)
+            else:
+                write(_TAG[_NODE] + _varint(idx))
+            values.reverse()
+            stack.extend(values)
+        elif isinstance(value, list):
+            write(_TAG[_LIST] + _varint(len(value)))
+            stack.extend(reversed(value))
+        elif value is None:
+            write(_TAG[_NONE])
+        elif value is True:
+            write(_TAG[_TRUE])
+        elif value is False:
+            write(_TAG[_FALSE])
+        elif isinstance(value, int):
+            write(_TAG[_INT] + _varint(value << 1 if value >= 0 else (-value << 1) - 1))
+        elif isinstance(value, float):
+            write(_TAG[_FLOAT] + _pack_float(value))
+        elif isinstance(value, bytes):
+            write(_TAG[_BYTES] + _varint(len(value)) + value)
+        else:
+            raise TypeError(f"Object of type {type(value).__name__} can't be encoded")
+
+
+def write(tree, fp, format="min", chunk_size=1 << 16):
+    """Encode `tree` into the binary file object `fp` as it is walked; returns the bytes written."""
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r}; expected one of {', '.join(FORMATS)}")
+    sink = _Sink(fp, chunk_size, text=format != "binary")
+    if format == "binary":
+        _write_binary(tree, sink.write)
+    elif format == "interned":
+        shapes = {}
+        sink.write(f'{{"format":"interned","version":{INTERNED_VERSION},"tree":')
+        _write_json(tree, sink.write, shapes=shapes)
+        sink.write(',"shapes":')
+        _write_json([[type_name, *fields] for type_name, fields in shapes], sink.write)
+        sink.write("}")
+    elif format == "min":
+        _write_json(tree, sink.write, dump_depth=_MIN_DUMP_DEPTH)
+    else:
+        _write_json(tree, sink.write, indent=2)
+    sink.flush()
+    return sink.written
+
+
+def dumps(tree, format="min"):
+    """Encode `tree` to bytes."""
+    buf = io.BytesIO()
+    write(tree, buf, format)
+    return buf.getvalue()
+
+
+def _decode_interned(doc):
+    shapes = [None] + doc["shapes"]
+    root = [None]
+    stack = [(root, iter([(0, doc["tree"])]))]
+    while stack:
+        container, items = stack[-1]
+        item = next(items, _END)
+        if item is _END:
+            stack.pop()
+            continue
+        slot, value = item
+        if isinstance(value, list):
+            if value[0] == 0:
+                decoded = [None] * (len(value) - 1)
+                stack.append((decoded, enumerate(value[1:])))
+            else:
+                type_name, *fields = shapes[value[0]]
+                decoded = {} if type_name is None else {"type": type_name}
+                stack.append((decoded, zip(fields, value[1:])))
+            value = decoded
+        container[slot] = value
+    return root[0]
+
+
+def _decode_binary(data):
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError("not a binary AST (bad magic)")
+    pos = len(BINARY_MAGIC)
+    strings = []
+    shapes = []
+
+    def read_varint():
+        nonlocal pos
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def read_str():
+        nonlocal pos
+        tag = data[pos]
+        pos += 1
+        if tag == _STR_REF:
+            return strings[read_varint()]
+        if tag == _NONE:
+            return None
+        n = read_varint()
+        s = data[pos:pos + n].decode("utf-8", "surrogatepass")
+        pos += n
+        strings.append(s)
+        return s
+
+    root = [None]
+    stack = [(root, iter((0,)))]
+    while stack:
+        container, slots = stack[-1]
+        slot = next(slots, _END)
+        if slot is _END:
+            stack.pop()
+            continue
+        tag = data[pos]
+        if tag in (_STR, _STR_REF):
+            value = read_str()
+        else:
+            pos += 1
+            if tag == _NONE:
+                value = None
+            elif tag == _TRUE:
+                value = True
+            elif tag == _FALSE:
+                value = False
+            elif tag == _INT:
+                n = read_varint()
+                value = -((n + 1) >> 1) if n & 1 else n >> 1
+            elif tag == _FLOAT:
+                value = _unpack_float(data, pos)[0]
+                pos += 8
+            elif tag == _BYTES:
+                n = read_varint()
+                value = bytes(data[pos:pos + n])
+                pos += n
+            elif tag == _LIST:
+                value = [None] * read_varint()
+                stack.append((value, iter(range(len(value)))))
+            elif tag in (_NODE, _SHAPE):
+                if tag == _SHAPE:
+                    type_name = read_str()
+                    shapes.append((type_name, [read_str() for _ in range(read_varint())]))
+                    type_name, fields = shapes[-1]
+                else:
+                    type_name, fields = shapes[read_varint()]
+                value = {} if type_name is None else {"type": type_name}
+                stack.append((value, iter(fields)))
+            else:
+                raise ValueError(f"bad tag {tag} at offset {pos - 1}")
+        container[slot] = value
+    return root[0]
+
+
+def loads(data):
+    """Decode a tree written in any of the formats (told apart by their first bytes)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if data.startswith(BINARY_MAGIC):
+        return _decode_binary(data)
+    doc = json.loads(data)
+    if isinstance(doc, dict) and doc.get("format") == "interned":
+        if doc.get("version") != INTERNED_VERSION:
+            raise ValueError(f"unsupported interned AST version {doc.get('version')!r}")
+        return _decode_interned(doc)
+    return doc
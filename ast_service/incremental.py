@@ -0,0 +1,201 @@
+"""Incremental re-parsing of edited Python documents.
+
+`IncrementalParser` remembers each document's lines and the compact tree of
+every top-level statement. On the next version only the region that changed
+is parsed and compacted: lines are compared from both ends, the statements
+touching the changed lines are parsed again on their own (the rest of the
+file is neither parsed nor compacted), and statements below the edit keep
+their nodes with line numbers moved. Inside the region old and new
+statements are matched with difflib over their source text, and the result
+comes back with a list of changes:
+
+    parser = IncrementalParser()
+    tree, changes = parser.parse("snippet.py", code)
+    tree, changes = parser.parse("snippet.py", edited_code)
+    # changes: [{"op": "change", "index": 3, "type": "Assign",
+    #            "old_lines": [4, 4], "new_lines": [4, 4], "node": {...}}]
+
+`op` is "insert", "remove" or "change"; `index` is the statement's position
+in the new body (in the old body for removals); line ranges are 1-based and
+inclusive, decorators included; `node` is the new compact node, absent for
+removals. Statements that only moved are not reported.
+
+Trees share their statement nodes with the parser, which moves their line
+numbers in place on later parses of the same document: deep-copy a tree to
+keep a snapshot of it.
+"""
+import ast
+import difflib
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from .python_parser import _compact
+
+# Line breaks as the tokenizer counts them (str.splitlines also splits on \f, \v, ...)
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+
+
+def _line_holders(node):
+    """Every dict in compact `node` that carries an int line number."""
+    holders = []
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if isinstance(value.get("lineno"), int):
+                holders.append(value)
+            stack.extend(v for v in value.values() if isinstance(v, (dict, list)))
+        elif isinstance(value, list):
+            stack.extend(v for v in value if isinstance(v, (dict, list)))
+    return holders
+
+
+class _Statement:
+    __slots__ = ("key", "start", "end", "node", "holders")
+
+    def __init__(self, key, start, end, node):
+        # Source text of the lines it spans plus its columns: equal keys mean equal statements
+        self.key = key
+        self.start = start
+        self.end = end
+        # The stdlib ast node until compacted
+        self.node = node
+        self.holders = None
+
+    def compact(self):
+        self.node = _compact(self.node)
+        return self
+
+    def shift(self, delta):
+        if not delta:
+            return
+        if self.holders is None:
+            self.holders = _line_holders(self.node)
+        for holder in self.holders:
+            holder["lineno"] += delta
+        self.start += delta
+        self.end += delta
+
+
+def _statements(tree, lines):
+    """The top-level statements of `tree` with their keys and line spans, not compacted yet."""
+    statements = []
+    for stmt in tree.body:
+        start = min([stmt.lineno] + [d.lineno for d in getattr(stmt, "decorator_list", ())])
+        end = stmt.end_lineno
+        key = (stmt.col_offset, stmt.end_col_offset, "".join(lines[start - 1:end]))
+        statements.append(_Statement(key, start, end, stmt))
+    return statements
+
+
+def _change(op, index, statement, old=None, new=None):
+    node = statement.node
+    change = {
+        "op": op,
+        "index": index,
+        "type": node["type"] if isinstance(node, dict) else type(node).__name__,
+        "old_lines": [old.start, old.end] if old else None,
+        "new_lines": [new.start, new.end] if new else None,
+    }
+    if new is not None:
+        change["node"] = new.node
+    return change
+
+
+class IncrementalParser:
+    """Parse successive versions of documents, re-compacting only what changed.
+
+    At most `max_documents` documents are remembered (least recently parsed
+    first out).
+    """
+
+    def __init__(self, max_documents=64):
+        self.max_documents = max_documents
+        self.reused = 0
+        self.compacted = 0
+        # doc_id -> (lines, statements)
+        self._documents = OrderedDict()
+
+    def parse(self, doc_id, code):
+        """Parse the latest `code` of `doc_id` and return (compact tree, changes).
+
+        The first version of a document reports every statement as inserted.
+        A SyntaxError leaves the remembered version untouched.
+        """
+        lines = _LINE.findall(code)
+        old_lines, old = self._documents.get(doc_id, ([], []))
+
+        # Unchanged lines at the start and end
+        limit = min(len(old_lines), len(lines))
+        head = 0
+        while head < limit and old_lines[head] == lines[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old_lines[-1 - tail] == lines[-1 - tail]:
+            tail += 1
+        delta = len(lines) - len(old_lines)
+
+        # Keep the statements that lie entirely in those lines and share no line with one that doesn't
+        ib = bisect_right(old, head, key=lambda s: s.end)
+        while 0 < ib < len(old) and old[ib].start <= old[ib - 1].end:
+            ib -= 1
+        ia = max(bisect_left(old, len(old_lines) - tail + 1, key=lambda s: s.start), ib)
+        while 0 < ia < len(old) and old[ia].start <= old[ia - 1].end:
+            ia += 1
+
+        # Parse the lines between them on their own, padded so line numbers come out right
+        lo = old[ib - 1].end if ib else 0
+        hi = (old[ia].start - 1 if ia < len(old) else len(old_lines)) + delta
+        try:
+            tree = ast.parse("\n" * lo + "".join(lines[lo:hi]))
+        except SyntaxError:
+            # Raises the error as the whole document sees it; if it parses after all, redo everything
+            tree = ast.parse(code)
+            ib, ia = 0, len(old)
+        region = _statements(tree, lines)
+
+        middle = []
+        changes = []
+        before = old[ib:ia]
+        matcher = difflib.SequenceMatcher(None, [s.key for s in before], [s.key for s in region], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for prev, new in zip(before[i1:i2], region[j1:j2]):
+                    prev.shift(new.start - prev.start)
+                    middle.append(prev)
+                continue
+            for new in region[j1:j2]:
+                new.compact()
+            self.compacted += j2 - j1
+            paired = min(i2 - i1, j2 - j1)
+            for n in range(paired):
+                changes.append(_change("change", ib + len(middle), region[j1 + n], before[i1 + n], region[j1 + n]))
+                middle.append(region[j1 + n])
+            for new in region[j1 + paired:j2]:
+                changes.append(_change("insert", ib + len(middle), new, new=new))
+                middle.append(new)
+            for i in range(i1 + paired, i2):
+                changes.append(_change("remove", ib + i, before[i], old=before[i]))
+
+        for statement in old[ia:]:
+            statement.shift(delta)
+        statements = old[:ib] + middle + old[ia:]
+        self.reused += len(statements) - sum(1 for c in changes if c["op"] != "remove")
+
+        self._documents[doc_id] = (lines, statements)
+        self._documents.move_to_end(doc_id)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+        return {"type": "Module", "body": [s.node for s in statements]}, changes
+
+    def forget(self, doc_id):
+        """Drop what is remembered about `doc_id`; its next parse starts from scratch."""
+        self._documents.pop(doc_id, None)
+
+    def stats(self):
+        return {
+            "documents": len(self._documents),
+            "reused": self.reused,
+            "compacted": self.compacted,
+        }
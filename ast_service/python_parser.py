@@ -3,27 +3,27 @@
 It converts ast.AST nodes to a serializable nested dict representation.
 """
 import ast
+import sys
 from .base import Parser
 from .registry import registry
 
 
-def _compact(node):
-    """Return a compact, human-friendly representation of AST `node` including line numbers.
+def _compact_recursive(node):
+    """Reference recursive implementation of `_compact`.
 
-    The compact representation keeps essential information and attaches a
-    `lineno` attribute to statement and key nodes so original source lines
-    can be remembered.
+    Kept for equivalence tests and benchmarks; it is limited by the Python
+    recursion limit on deeply nested trees.
     """
     # Module
     if isinstance(node, ast.Module):
-        return {"type": "Module", "body": [_compact(n) for n in node.body]}
+        return {"type": "Module", "body": [_compact_recursive(n) for n in node.body]}
 
     # Assign
     if isinstance(node, ast.Assign):
         return {
             "type": "Assign",
-            "targets": [_compact(t) for t in node.targets],
-            "value": _compact(node.value),
+            "targets": [_compact_recursive(t) for t in node.targets],
+            "value": _compact_recursive(node.value),
             "lineno": getattr(node, "lineno", None),
         }
 
@@ -40,48 +40,48 @@ def _compact(node):
 
     # Expr -> unwrap
     if isinstance(node, ast.Expr):
-        return _compact(node.value)
+        return _compact_recursive(node.value)
 
     # Call
     if isinstance(node, ast.Call):
-        func = _compact(node.func)
-        args = [_compact(a) for a in node.args]
+        func = _compact_recursive(node.func)
+        args = [_compact_recursive(a) for a in node.args]
         return {"type": "Call", "func": func, "args": args, "lineno": getattr(node, "lineno", None)}
 
     # If
     if isinstance(node, ast.If):
         return {
             "type": "If",
-            "test": _compact(node.test),
-            "body": [_compact(n) for n in node.body],
-            "orelse": [_compact(n) for n in node.orelse],
+            "test": _compact_recursive(node.test),
+            "body": [_compact_recursive(n) for n in node.body],
+            "orelse": [_compact_recursive(n) for n in node.orelse],
             "lineno": getattr(node, "lineno", None),
         }
 
     # Compare
     if isinstance(node, ast.Compare):
         ops = [op.__class__.__name__ for op in node.ops]
-        comps = [_compact(c) for c in node.comparators]
-        return {"type": "Compare", "left": _compact(node.left), "ops": ops, "comparators": comps, "lineno": getattr(node, "lineno", None)}
+        comps = [_compact_recursive(c) for c in node.comparators]
+        return {"type": "Compare", "left": _compact_recursive(node.left), "ops": ops, "comparators": comps, "lineno": getattr(node, "lineno", None)}
 
     # BinOp
     if isinstance(node, ast.BinOp):
         return {
             "type": "BinOp",
             "op": node.op.__class__.__name__,
-            "left": _compact(node.left),
-            "right": _compact(node.right),
+            "left": _compact_recursive(node.left),
+            "right": _compact_recursive(node.right),
             "lineno": getattr(node, "lineno", None),
         }
 
     # FunctionDef
     if isinstance(node, ast.FunctionDef):
         args = [a.arg for a in node.args.args]
-        return {"type": "FunctionDef", "name": node.name, "args": args, "body": [_compact(n) for n in node.body], "lineno": getattr(node, "lineno", None)}
+        return {"type": "FunctionDef", "name": node.name, "args": args, "body": [_compact_recursive(n) for n in node.body], "lineno": getattr(node, "lineno", None)}
 
     # Return
     if isinstance(node, ast.Return):
-        return {"type": "Return", "value": _compact(node.value), "lineno": getattr(node, "lineno", None)}
+        return {"type": "Return", "value": _compact_recursive(node.value), "lineno": getattr(node, "lineno", None)}
 
     # Fallback
     if isinstance(node, ast.AST):
@@ -89,9 +89,9 @@ def _compact(node):
         res = {"type": t}
         for field, value in ast.iter_fields(node):
             if isinstance(value, ast.AST):
-                res[field] = _compact(value)
+                res[field] = _compact_recursive(value)
             elif isinstance(value, list):
-                lst = [_compact(x) if isinstance(x, ast.AST) else x for x in value]
+                lst = [_compact_recursive(x) if isinstance(x, ast.AST) else x for x in value]
                 if lst:
                     res[field] = lst
             else:
@@ -105,7 +105,208 @@ def _compact(node):
     return node
 
 
+# ---------------------------------------------------------------------------
+# Iterative engine
+#
+# Work items are (node, container, key) triples on an explicit stack: a handler
+# builds the node's compact form, stores it at container[key] and pushes its
+# children with placeholders to fill in. Dict keys are created in their final
+# order up front, so the output is identical to the recursive version.
+# ---------------------------------------------------------------------------
+
+def _children(nodes, push):
+    lst = [None] * len(nodes)
+    for i, child in enumerate(nodes):
+        push((child, lst, i))
+    return lst
+
+
+def _h_module(node, parent, key, push):
+    parent[key] = {"type": "Module", "body": _children(node.body, push)}
+
+
+def _h_assign(node, parent, key, push):
+    res = {
+        "type": "Assign",
+        "targets": _children(node.targets, push),
+        "value": None,
+        "lineno": getattr(node, "lineno", None),
+    }
+    push((node.value, res, "value"))
+    parent[key] = res
+
+
+def _h_name(node, parent, key, push):
+    res = {"type": "Name", "name": node.id}
+    if hasattr(node, "lineno"):
+        res["lineno"] = node.lineno
+    parent[key] = res
+
+
+def _h_constant(node, parent, key, push):
+    parent[key] = node.value
+
+
+def _h_expr(node, parent, key, push):
+    # unwrap: the value takes the Expr's place
+    push((node.value, parent, key))
+
+
+def _h_call(node, parent, key, push):
+    res = {"type": "Call", "func": None, "args": _children(node.args, push), "lineno": getattr(node, "lineno", None)}
+    push((node.func, res, "func"))
+    parent[key] = res
+
+
+def _h_if(node, parent, key, push):
+    res = {
+        "type": "If",
+        "test": None,
+        "body": _children(node.body, push),
+        "orelse": _children(node.orelse, push),
+        "lineno": getattr(node, "lineno", None),
+    }
+    push((node.test, res, "test"))
+    parent[key] = res
+
+
+def _h_compare(node, parent, key, push):
+    res = {
+        "type": "Compare",
+        "left": None,
+        "ops": [op.__class__.__name__ for op in node.ops],
+        "comparators": _children(node.comparators, push),
+        "lineno": getattr(node, "lineno", None),
+    }
+    push((node.left, res, "left"))
+    parent[key] = res
+
+
+def _h_binop(node, parent, key, push):
+    res = {
+        "type": "BinOp",
+        "op": node.op.__class__.__name__,
+        "left": None,
+        "right": None,
+        "lineno": getattr(node, "lineno", None),
+    }
+    push((node.left, res, "left"))
+    push((node.right, res, "right"))
+    parent[key] = res
+
+
+def _h_function_def(node, parent, key, push):
+    parent[key] = {
+        "type": "FunctionDef",
+        "name": node.name,
+        "args": [a.arg for a in node.args.args],
+        "body": _children(node.body, push),
+        "lineno": getattr(node, "lineno", None),
+    }
+
+
+def _h_return(node, parent, key, push):
+    res = {"type": "Return", "value": None, "lineno": getattr(node, "lineno", None)}
+    push((node.value, res, "value"))
+    parent[key] = res
+
+
+def _make_generic_handler(cls):
+    """Build the fallback handler for `cls`, with its field names bound once."""
+    type_name = cls.__name__
+    fields = cls._fields
+    AST = ast.AST
+
+    def _h_generic(node, parent, key, push):
+        res = {"type": type_name}
+        for field in fields:
+            try:
+                value = getattr(node, field)
+            except AttributeError:
+                continue
+            if isinstance(value, AST):
+                res[field] = None
+                push((value, res, field))
+            elif isinstance(value, list):
+                if value:
+                    lst = list(value)
+                    for i, x in enumerate(value):
+                        if isinstance(x, AST):
+                            push((x, lst, i))
+                    res[field] = lst
+            else:
+                if value not in (None, ""):
+                    res[field] = value
+        if hasattr(node, "lineno"):
+            res["lineno"] = node.lineno
+        parent[key] = res
+
+    return _h_generic
+
+
+def _h_primitive(node, parent, key, push):
+    parent[key] = node
+
+
+# Handlers for the node types with a dedicated compact form
+_BASE_HANDLERS = {
+    ast.Module: _h_module,
+    ast.Assign: _h_assign,
+    ast.Name: _h_name,
+    ast.Constant: _h_constant,
+    ast.Expr: _h_expr,
+    ast.Call: _h_call,
+    ast.If: _h_if,
+    ast.Compare: _h_compare,
+    ast.BinOp: _h_binop,
+    ast.FunctionDef: _h_function_def,
+    ast.Return: _h_return,
+}
+
+# Exact type -> handler; other types are resolved once and memoized here
+_HANDLERS = dict(_BASE_HANDLERS)
+
+
+def _resolve_handler(cls):
+    for base in cls.__mro__:
+        if base in _BASE_HANDLERS:
+            handler = _BASE_HANDLERS[base]
+            break
+    else:
+        handler = _make_generic_handler(cls) if issubclass(cls, ast.AST) else _h_primitive
+    _HANDLERS[cls] = handler
+    return handler
+
+
+def _compact(node):
+    """Return a compact, human-friendly representation of AST `node` including line numbers.
+
+    The compact representation keeps essential information and attaches a
+    `lineno` attribute to statement and key nodes so original source lines
+    can be remembered.
+
+    Walks the tree with an explicit stack and a type -> handler dispatch
+    table, so nesting depth is not bounded by the recursion limit.
+    """
+    root = [None]
+    stack = [(node, root, 0)]
+    push = stack.append
+    pop = stack.pop
+    handlers = _HANDLERS
+    while stack:
+        item = pop()
+        n = item[0]
+        handler = handlers.get(n.__class__)
+        if handler is None:
+            handler = _resolve_handler(n.__class__)
+        handler(n, item[1], item[2], push)
+    return root[0]
+
+
 class PythonParser(Parser):
+    # The stdlib ast differs between Python versions, so it is part of the version
+    version = f"1-py{sys.version_info[0]}.{sys.version_info[1]}"
+
     def parse(self, code: str) -> dict:
         tree = ast.parse(code)
         return _compact(tree)
@@ -1,15 +1,16 @@
-from typing import Dict, Optional
+# Postponed annotations keep `typing` (and its imports) off the package's import path
+from __future__ import annotations
 
 
 class LanguageRegistry:
     def __init__(self):
-        self._parsers: Dict[str, object] = {}
+        self._parsers: dict[str, object] = {}
 
     def register(self, name: str, parser: object) -> None:
         """Register a parser instance for a language name."""
         self._parsers[name.lower()] = parser
 
-    def get(self, name: str) -> Optional[object]:
+    def get(self, name: str) -> object | None:
         return self._parsers.get(name.lower())
 
 
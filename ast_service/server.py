@@ -0,0 +1,325 @@
+"""Long-running asyncio parse server.
+
+Keeps one interpreter (and a warm process pool) alive so consumers no longer
+pay interpreter startup and package import per parse. Speaks newline-delimited
+JSON-RPC over a Unix socket or stdio:
+
+    -> {"id": 1, "method": "parse", "params": {"code": "x = 1", "language": "python"}}
+    <- {"id": 1, "result": {"type": "Module", ...}}
+
+Methods:
+- parse:        params {"code", "language"?} -> compact AST
+- parse_batch:  params {"items": [{"code", "language"?}, ...]} -> [{"ast"} | {"error"}, ...]
+- stats:        -> request counters and p50/p99 latency in milliseconds
+
+Requests on a connection may be pipelined; responses are written as soon as
+each one finishes and are matched by "id". At most `max_in_flight` requests
+are processed at once across all connections; beyond that the server stops
+reading, which pushes back on clients through the socket buffers.
+
+Usage:
+    python -m ast_service.server --socket /tmp/ast_service.sock
+    python -m ast_service.server --stdio
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import parse_code
+
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class LatencyStats:
+    """Latencies of the most recent `window` requests, in seconds."""
+
+    def __init__(self, window=10000):
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, pct):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[idx]
+
+
+def _parse_item(item):
+    """Runs in a pool worker: parse one {"code", "language"} item."""
+    return parse_code(item["code"], item.get("language", "python"))
+
+
+def _parse_batch_items(items):
+    """Runs in a pool worker: parse several items, reporting errors per item."""
+    results = []
+    for item in items:
+        try:
+            results.append({"ast": _parse_item(item)})
+        except Exception as e:
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def _check_item(item):
+    if not isinstance(item, dict) or not isinstance(item.get("code"), str):
+        raise RequestError(INVALID_PARAMS, 'expected {"code": str, "language"?: str}')
+    return item
+
+
+class _StdoutWriter:
+    """The subset of StreamWriter used by the server, writing to stdout.
+
+    Unlike a pipe transport this also works when stdout is a regular file.
+    """
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+class ParseServer:
+    def __init__(self, workers=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 max_request_bytes=DEFAULT_MAX_REQUEST_BYTES, latency_window=10000):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight
+        self.max_request_bytes = max_request_bytes
+        self.latency = LatencyStats(latency_window)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._slots = None
+        self._pool = None
+
+    def _ensure_started(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def start_unix(self, path):
+        """Listen on Unix socket `path` and return the asyncio server."""
+        self._ensure_started()
+        if os.path.exists(path):
+            os.remove(path)
+        return await asyncio.start_unix_server(self.handle_connection, path=path, limit=self.max_request_bytes)
+
+    async def serve_stdio(self):
+        """Serve a single connection over this process's stdin/stdout."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=self.max_request_bytes)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        await self.handle_connection(reader, _StdoutWriter())
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        p50 = self.latency.percentile(50)
+        p99 = self.latency.percentile(99)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_in_flight": self.max_in_flight,
+            "workers": self.workers,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None,
+        }
+
+    async def handle_connection(self, reader, writer):
+        self._ensure_started()
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Request larger than max_request_bytes: report it and drop the connection
+                    await self._send(writer, write_lock, {"id": None, "error": {
+                        "code": INVALID_REQUEST, "message": "request too large"}})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Backpressure: stop reading until a slot frees up
+                await self._slots.acquire()
+                task = asyncio.ensure_future(self._process(line, writer, write_lock, time.perf_counter()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def _process(self, line, writer, write_lock, started):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise RequestError(INVALID_REQUEST, "request must be a JSON object")
+                request_id = request.get("id")
+                result = await self._dispatch(request.get("method"), request.get("params") or {})
+                response = {"id": request_id, "result": result}
+            except json.JSONDecodeError as e:
+                response = {"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}}
+            except RequestError as e:
+                response = {"id": request_id, "error": {"code": e.code, "message": str(e)}}
+            except Exception as e:
+                response = {"id": request_id, "error": {"code": SERVER_ERROR, "message": f"{type(e).__name__}: {e}"}}
+            if "error" in response:
+                self.errors += 1
+            await self._send(writer, write_lock, response)
+        finally:
+            self.in_flight -= 1
+            self.requests += 1
+            self.latency.add(time.perf_counter() - started)
+            self._slots.release()
+
+    async def _dispatch(self, method, params):
+        loop = asyncio.get_running_loop()
+        if method == "parse":
+            return await loop.run_in_executor(self._pool, _parse_item, _check_item(params))
+        if method == "parse_batch":
+            items = params.get("items")
+            if not isinstance(items, list):
+                raise RequestError(INVALID_PARAMS, 'expected {"items": [...]}')
+            items = [_check_item(item) for item in items]
+            # Spread the batch over the pool in one chunk per worker
+            size = max(1, -(-len(items) // self.workers))
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            parts = await asyncio.gather(*(loop.run_in_executor(self._pool, _parse_batch_items, c) for c in chunks))
+            return list(itertools.chain.from_iterable(parts))
+        if method == "stats":
+            return self.stats()
+        raise RequestError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+
+    @staticmethod
+    async def _send(writer, write_lock, response):
+        try:
+            data = json.dumps(response, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            # e.g. a bytes constant in the tree
+            data = json.dumps({"id": response.get("id"), "error": {"code": SERVER_ERROR, "message": str(e)}})
+        data = data.encode("utf-8") + b"\n"
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+
+class ParseClient:
+    """Minimal pipelining client for a `ParseServer` listening on a Unix socket."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect_unix(cls, path, limit=DEFAULT_MAX_REQUEST_BYTES):
+        reader, writer = await asyncio.open_unix_connection(path, limit=limit)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("server closed the connection"))
+
+    async def call(self, method, params=None):
+        """Send one request and return the raw response dict ({"result"} or {"error"})."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        data = json.dumps({"id": request_id, "method": method, "params": params or {}}).encode("utf-8")
+        self._writer.write(data + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def parse(self, code, language="python"):
+        response = await self.call("parse", {"code": code, "language": language})
+        if "error" in response:
+            raise ValueError(response["error"]["message"])
+        return response["result"]
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AST parse server")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--socket", "-s", help="Unix socket path to listen on")
+    where.add_argument("--stdio", action="store_true", help="Serve a single client over stdin/stdout")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help=f"Requests processed concurrently before reads pause (default: {DEFAULT_MAX_IN_FLIGHT})")
+    args = parser.parse_args(argv)
+
+    server = ParseServer(workers=args.workers, max_in_flight=args.max_in_flight)
+
+    async def run():
+        if args.stdio:
+            await server.serve_stdio()
+        else:
+            listener = await server.start_unix(args.socket)
+            async with listener:
+                await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
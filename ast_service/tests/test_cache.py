@@ -0,0 +1,69 @@
+import os
+import pytest
+import ast_service
+from ast_service.cache import ParseCache
+from ast_service import cache_stats, clear_cache, disable_cache, enable_cache, parse_code, run_file
+
+
+@pytest.fixture(autouse=True)
+def _no_cache_leak():
+    yield
+    disable_cache()
+
+
+def test_cache_disabled_by_default():
+    assert cache_stats() is None
+
+
+def test_memory_hit_returns_equal_independent_tree():
+    enable_cache()
+    code = "x = 1\nprint(x)\n"
+    first = parse_code(code)
+    second = parse_code(code)
+
+    assert first == second
+    assert first is not second
+    second["body"].clear()
+    assert parse_code(code) == first
+
+    stats = cache_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_disk_store_survives_new_cache(tmp_path):
+    enable_cache(disk_dir=str(tmp_path))
+    tree = parse_code("y = 2\n")
+
+    enable_cache(disk_dir=str(tmp_path))
+    assert parse_code("y = 2\n") == tree
+    assert cache_stats()["disk_hits"] == 1
+
+    clear_cache()
+    assert parse_code("y = 2\n") == tree
+    assert cache_stats()["misses"] == 1
+
+
+def test_run_file_short_circuits_on_unchanged_stat(tmp_path, monkeypatch):
+    enable_cache()
+    p = tmp_path / "snippet.py"
+    p.write_text("x = 3\n")
+    tree = run_file(str(p))
+
+    # An unchanged file must not even be opened again
+    def _no_open(*args, **kwargs):
+        raise AssertionError("file was re-read")
+    monkeypatch.setattr("builtins.open", _no_open)
+    assert run_file(str(p)) == tree
+    monkeypatch.undo()
+    assert cache_stats()["file_hits"] == 1
+
+    p.write_text("x = 300\n")
+    os.utime(p, ns=(0, 0))
+    assert run_file(str(p))["body"][0]["value"] == 300
+
+
+def test_key_includes_language_and_parser_version():
+    parser = ast_service.registry.get("python")
+    key = ParseCache.make_key("python", parser.version, "x = 1")
+    assert key != ParseCache.make_key("python", parser.version + "x", "x = 1")
+    assert key != ParseCache.make_key("other", parser.version, "x = 1")
@@ -1,5 +1,7 @@
 import io
+import os
 import sys
+import pytest
 from ast_service import run_code
 from ast_service import cli
 
@@ -29,3 +31,56 @@ def test_run_file_tmp_path(tmp_path):
     # ensure we can see an Assign and Call in the body
     types = [n.get("type") for n in ast_obj["body"]]
     assert "Assign" in types and "Call" in types
+
+
+def test_cli_batch_streams_json_lines(tmp_path, capsys):
+    import json
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "pkg" / "b.py").write_text("def b():\n    return 2\n")
+    (tmp_path / "pkg" / "broken.py").write_text("def (:\n")
+    (tmp_path / "notes.txt").write_text("not python")
+
+    cli.main(["--batch", str(tmp_path), str(tmp_path / "*.py"), "--jobs", "2"])
+    lines = capsys.readouterr().out.splitlines()
+    results = {json.loads(line)["path"]: json.loads(line) for line in lines}
+
+    assert len(lines) == 3  # a.py is matched twice but parsed once
+    assert sorted(os.path.basename(p) for p in results) == ["a.py", "b.py", "broken.py"]
+    by_name = {os.path.basename(p): r for p, r in results.items()}
+    assert by_name["a.py"]["ast"]["body"][0]["type"] == "Assign"
+    assert by_name["b.py"]["ast"]["body"][0]["name"] == "b"
+    assert by_name["broken.py"]["error"].startswith("SyntaxError")
+
+
+def test_parse_files_bounds_pending_work(tmp_path):
+    from ast_service.batch import parse_files
+    paths = []
+    for i in range(20):
+        p = tmp_path / f"m{i}.py"
+        p.write_text(f"x{i} = {i}\n")
+        paths.append(str(p))
+
+    consumed = []
+
+    def lazy_paths():
+        for p in paths:
+            consumed.append(p)
+            yield p
+
+    results = parse_files(lazy_paths(), workers=2, max_pending=3)
+    next(results)
+    assert len(consumed) <= 4
+    assert len(list(results)) == 19
+
+
+def test_cli_output_is_left_alone_when_encoding_fails(tmp_path):
+    out = tmp_path / "out.json"
+    cli.main(["--code", "x = 1\n", "--output", str(out)])
+    assert b"Module" in out.read_bytes()
+
+    before = out.read_bytes()
+    with pytest.raises(TypeError):
+        cli.main(["--code", "x = ...\n", "--output", str(out)])
+    assert out.read_bytes() == before
+    assert os.listdir(tmp_path) == ["out.json"]
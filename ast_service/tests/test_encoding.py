@@ -0,0 +1,79 @@
+import io
+import json
+import pytest
+from ast_service import cli, parse_code
+from ast_service.encoding import BINARY_MAGIC, FORMATS, dumps, loads, write
+
+CODE = """import os
+
+def area(w, h=2):
+    '''Rectangle area.'''
+    return w * h * 1.5
+
+if area(3) > -1:
+    print("big", None, True, 10 ** 30)
+"""
+
+
+def test_json_formats_match_json_dumps():
+    tree = parse_code(CODE)
+    assert dumps(tree, "json").decode() == json.dumps(tree, indent=2)
+    assert dumps(tree, "min").decode() == json.dumps(tree, separators=(",", ":"))
+    assert dumps({"type": "X", "a": [], "b": {}, "c": "é"}, "json").decode() == \
+        json.dumps({"type": "X", "a": [], "b": {}, "c": "é"}, indent=2)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_every_format_round_trips(fmt):
+    tree = parse_code(CODE)
+    assert loads(dumps(tree, fmt)) == tree
+
+
+def test_compact_formats_are_smaller():
+    tree = parse_code(CODE * 20)
+    sizes = {fmt: len(dumps(tree, fmt)) for fmt in FORMATS}
+    assert sizes["binary"] < sizes["interned"] < sizes["min"] < sizes["json"]
+
+
+def test_binary_keeps_bytes_and_big_ints():
+    tree = {"type": "Constant", "values": [b"\x00raw", -(2 ** 70), 2 ** 70, 0.1, "\ud800"], "extra": None}
+    data = dumps(tree, "binary")
+    assert data.startswith(BINARY_MAGIC)
+    assert loads(data) == tree
+    with pytest.raises(TypeError):
+        dumps(tree, "min")
+
+
+def test_write_streams_in_chunks_and_handles_deep_nesting():
+    class Recorder(io.RawIOBase):
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, b):
+            self.chunks.append(bytes(b))
+            return len(b)
+
+    depth = 3000
+    tree = leaf = {"type": "BinOp", "left": 1, "right": None}
+    for _ in range(depth):
+        leaf["right"] = {"type": "BinOp", "left": 1, "right": None}
+        leaf = leaf["right"]
+
+    for fmt in FORMATS:
+        out = Recorder()
+        written = write(tree, out, fmt, chunk_size=1024)
+        assert written == sum(map(len, out.chunks))
+        assert len(out.chunks) > 1
+    decoded = loads(dumps(tree, "binary"))
+    for _ in range(depth):
+        decoded = decoded["right"]
+    assert decoded == {"type": "BinOp", "left": 1, "right": None}
+
+
+def test_cli_format_and_output(tmp_path, capsys):
+    cli.main(["--code", "x = 1\n", "--format", "min"])
+    assert capsys.readouterr().out == json.dumps(parse_code("x = 1\n"), separators=(",", ":")) + "\n"
+
+    out = tmp_path / "ast.bin"
+    cli.main(["--code", "x = 1\n", "--format", "binary", "-o", str(out)])
+    assert loads(out.read_bytes()) == parse_code("x = 1\n")
@@ -0,0 +1,64 @@
+"""Import-time budgets for the parse-only entry points.
+
+Each entry point is imported in a fresh interpreter with ``-X importtime`` and
+its cumulative import time (everything it pulls in, excluding interpreter
+startup) must stay within the stated budget. Budgets are roughly 3x what
+these imports take on a developer laptop, leaving headroom for slow CI.
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# entry point module -> budget in milliseconds
+BUDGETS_MS = {
+    "ast_service": 60,
+    "ast_service.cli": 100,
+    "main": 100,
+}
+
+# The rendering stack must never be loaded by these entry points
+HEAVY_MODULES = ["manim", "numpy", "gtts", "mutagen", "code_animator_poc.engine"]
+
+
+def _run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+
+
+def _cumulative_import_ms(module):
+    stderr = _run(f"import {module}", "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].rstrip() == f" {module}":
+            return int(parts[1]) / 1000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_time_within_budget(module):
+    # best of three to smooth over noisy machines
+    elapsed = min(_cumulative_import_ms(module) for _ in range(3))
+    assert elapsed <= BUDGETS_MS[module], f"import {module} took {elapsed:.1f} ms (budget {BUDGETS_MS[module]} ms)"
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_entry_point_does_not_load_render_stack(module):
+    out = _run(f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))").stdout
+    assert out.strip() == ""
+
+
+def test_cli_parse_path_stays_light():
+    code = (
+        "import sys, io, contextlib\n"
+        "from ast_service import cli\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    cli.main(['--code', 'x = 1'])\n"
+        "print(' '.join(m for m in ('concurrent.futures', 'asyncio', 'hashlib') if m in sys.modules))\n"
+    )
+    assert _run(code).stdout.strip() == ""
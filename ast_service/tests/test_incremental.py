@@ -0,0 +1,84 @@
+import pytest
+from ast_service import parse_code, parse_incremental
+from ast_service.incremental import IncrementalParser
+
+CODE = """x = 1
+y = 2
+
+@decorate
+def add(a, b):
+    return a + b
+
+print(add(x, y))
+"""
+
+
+def test_first_parse_inserts_everything_and_matches_parse_code():
+    parser = IncrementalParser()
+    tree, changes = parser.parse("doc", CODE)
+    assert tree == parse_code(CODE)
+    assert [(c["op"], c["index"], c["type"]) for c in changes] == [
+        ("insert", 0, "Assign"), ("insert", 1, "Assign"), ("insert", 2, "FunctionDef"), ("insert", 3, "Call"),
+    ]
+    assert changes[2]["new_lines"] == [4, 6]
+
+
+def test_edit_recompacts_only_changed_statement():
+    parser = IncrementalParser()
+    first, _ = parser.parse("doc", CODE)
+    edited = CODE.replace("y = 2", "y = 3")
+    tree, changes = parser.parse("doc", edited)
+
+    assert tree == parse_code(edited)
+    assert changes == [{"op": "change", "index": 1, "type": "Assign", "old_lines": [2, 2],
+                        "new_lines": [2, 2], "node": tree["body"][1]}]
+    # unchanged statements are reused as they are
+    assert tree["body"][2] is first["body"][2]
+    assert parser.stats()["compacted"] == 4 + 1
+
+
+def test_inserted_lines_shift_reused_statements():
+    parser = IncrementalParser()
+    first, _ = parser.parse("doc", CODE)
+    edited = "import os\n\n" + CODE.replace("print(add(x, y))\n", "")
+    tree, changes = parser.parse("doc", edited)
+
+    assert tree == parse_code(edited)
+    ops = sorted((c["op"], c["index"], c["old_lines"], c["new_lines"]) for c in changes)
+    assert ops == [("insert", 0, None, [1, 1]), ("remove", 3, [8, 8], None)]
+    assert tree["body"][3]["lineno"] == 7
+    # reused nodes are moved in place rather than rebuilt
+    assert tree["body"][3] is first["body"][2]
+    assert parser.stats()["compacted"] == 4 + 1
+
+
+def test_statements_sharing_a_line_are_told_apart():
+    parser = IncrementalParser()
+    parser.parse("doc", "a = 1; b = 2\n")
+    tree, changes = parser.parse("doc", "a = 1; b = 2\nc = 3\n")
+    assert [(c["op"], c["index"]) for c in changes] == [("insert", 2)]
+    assert tree == parse_code("a = 1; b = 2\nc = 3\n")
+
+
+def test_syntax_error_keeps_previous_version():
+    parser = IncrementalParser()
+    parser.parse("doc", CODE)
+    with pytest.raises(SyntaxError):
+        parser.parse("doc", "x = (\n")
+    _, changes = parser.parse("doc", CODE)
+    assert changes == []
+
+
+def test_documents_are_independent_and_bounded():
+    parser = IncrementalParser(max_documents=1)
+    parser.parse("a", "x = 1\n")
+    parser.parse("b", "x = 1\n")
+    _, changes = parser.parse("a", "x = 1\n")
+    assert [c["op"] for c in changes] == ["insert"]
+
+
+def test_parse_incremental_is_python_only():
+    tree, _ = parse_incremental("test_incremental.py", "x = 1\n")
+    assert tree == parse_code("x = 1\n")
+    with pytest.raises(ValueError):
+        parse_incremental("doc", "x", language="javascript")
@@ -43,3 +43,44 @@ else:
     assert then_call["func"]["name"] == "print"
     assert then_call["args"] == ["Even"]
     assert then_call.get("lineno") == 3
+
+
+def _snippet_sources():
+    import glob
+    import os
+    pattern = os.path.join(os.path.dirname(__file__), "..", "code_snippets", "*.py")
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as fh:
+            yield fh.read()
+
+
+def test_iterative_compact_matches_recursive():
+    import ast
+    from ast_service.python_parser import _compact, _compact_recursive
+    extra = """
+def f(a, b=2, *args, **kw):
+    global g
+    for i in range(3):
+        while a < b:
+            a += 1
+    return [x * 2 for x in args if x] or {k: v for k, v in kw.items()}
+
+class C(object):
+    attr: int = 1
+    async def m(self):
+        await self.n()
+"""
+    for source in list(_snippet_sources()) + [extra]:
+        tree = ast.parse(source)
+        assert json.dumps(_compact(tree)) == json.dumps(_compact_recursive(tree))
+
+
+def test_deep_nesting_does_not_hit_recursion_limit():
+    depth = 2000
+    ast_obj = parse_code("x = " + " + ".join(["1"] * depth) + "\n", "python")
+    node = ast_obj["body"][0]["value"]
+    levels = 0
+    while isinstance(node, dict) and node.get("type") == "BinOp":
+        node = node["left"]
+        levels += 1
+    assert levels == depth - 1
@@ -1,3 +1,115 @@
-import pytest
+import asyncio
+import json
+from ast_service import parse_code
+from ast_service.server import METHOD_NOT_FOUND, ParseClient, ParseServer
 
-pytest.skip("server removed — skipping server tests", allow_module_level=True)
+
+def _run_with_server(tmp_path, scenario, **server_kwargs):
+    """Start a server on a Unix socket in tmp_path, run `scenario(client, server)`, shut down."""
+    server = ParseServer(workers=2, **server_kwargs)
+    path = str(tmp_path / "ast.sock")
+
+    async def main():
+        listener = await server.start_unix(path)
+        client = await ParseClient.connect_unix(path)
+        try:
+            return await scenario(client, server)
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        server.close()
+
+
+def test_parse_matches_parse_code(tmp_path):
+    code = "x = 1\nif x == 1:\n    print(x)\n"
+
+    async def scenario(client, server):
+        return await client.parse(code)
+
+    assert _run_with_server(tmp_path, scenario) == parse_code(code)
+
+
+def test_pipelined_requests_all_answered(tmp_path):
+    codes = [f"v{i} = {i}\n" for i in range(50)]
+
+    async def scenario(client, server):
+        return await asyncio.gather(*(client.parse(c) for c in codes))
+
+    results = _run_with_server(tmp_path, scenario, max_in_flight=4)
+    assert [r["body"][0]["targets"][0]["name"] for r in results] == [f"v{i}" for i in range(50)]
+
+
+def test_backpressure_limits_in_flight(tmp_path):
+    async def scenario(client, server):
+        await asyncio.gather(*(client.parse(f"y = {i}\n") for i in range(30)))
+        return server.stats()
+
+    stats = _run_with_server(tmp_path, scenario, max_in_flight=3)
+    assert stats["requests"] == 30
+    assert stats["peak_in_flight"] <= 3
+
+
+def test_batch_reports_errors_per_item(tmp_path):
+    items = [{"code": "a = 1"}, {"code": "def (:"}, {"code": "b = 2", "language": "python"}]
+
+    async def scenario(client, server):
+        return await client.call("parse_batch", {"items": items})
+
+    response = _run_with_server(tmp_path, scenario)
+    results = response["result"]
+    assert len(results) == 3
+    assert results[0]["ast"]["body"][0]["type"] == "Assign"
+    assert results[1]["error"].startswith("SyntaxError")
+    assert results[2]["ast"]["body"][0]["targets"][0]["name"] == "b"
+
+
+def test_errors_keep_connection_usable_and_stats_report_latency(tmp_path):
+    async def scenario(client, server):
+        bad_code = await client.call("parse", {"code": "def (:"})
+        unknown = await client.call("nope")
+        ok = await client.parse("z = 3")
+        stats = await client.call("stats")
+        return bad_code, unknown, ok, stats
+
+    bad_code, unknown, ok, stats = _run_with_server(tmp_path, scenario)
+    assert "SyntaxError" in bad_code["error"]["message"]
+    assert unknown["error"]["code"] == METHOD_NOT_FOUND
+    assert ok["body"][0]["value"] == 3
+    stats = stats["result"]
+    assert stats["requests"] == 3 and stats["errors"] == 2
+    assert stats["p50_ms"] is not None and stats["p99_ms"] >= stats["p50_ms"]
+
+
+def test_malformed_json_line(tmp_path):
+    path = str(tmp_path / "raw.sock")
+    server = ParseServer(workers=1)
+
+    async def main():
+        listener = await server.start_unix(path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"{not json\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+
+    try:
+        response = asyncio.run(main())
+    finally:
+        server.close()
+    assert response["id"] is None and "error" in response
+
+
+def test_unserializable_result_becomes_error(tmp_path):
+    async def scenario(client, server):
+        return await client.call("parse", {"code": "data = b'raw'"})
+
+    response = _run_with_server(tmp_path, scenario)
+    assert "bytes" in response["error"]["message"]
@@ -0,0 +1,75 @@
+"""Throughput of the iterative `_compact` versus the recursive reference.
+
+Usage:
+    python -m benchmarks.bench_compact [--repeat 5]
+
+Inputs are the `ast_service/code_snippets` files, a synthetic module with
+10k+ statements and expressions nested 500 and 2000 levels deep. Parsing is
+done once up front; only the compaction is timed.
+"""
+import argparse
+import ast
+import glob
+import os
+import time
+
+from ast_service.python_parser import _compact, _compact_recursive
+
+SNIPPETS_DIR = os.path.join(os.path.dirname(__file__), "..", "ast_service", "code_snippets")
+
+
+def synthetic_module(n_statements=10_000):
+    lines = []
+    for i in range(n_statements // 4):
+        lines.append(f"v{i} = {i} * 2 + {i}")
+        lines.append(f"if v{i} > {i}:")
+        lines.append(f"    print('big', v{i})")
+        lines.append(f"items_{i} = [x for x in range({i % 7}) if x % 2 == 0]")
+    return "\n".join(lines) + "\n"
+
+
+def nested_expression(depth):
+    return "x = " + " + ".join(["1"] * depth) + "\n"
+
+
+def _inputs():
+    snippets = []
+    for path in sorted(glob.glob(os.path.join(SNIPPETS_DIR, "*.py"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            snippets.append(fh.read())
+    yield "code_snippets (all)", [ast.parse(s) for s in snippets]
+    yield "synthetic 10k statements", [ast.parse(synthetic_module())]
+    yield "nesting depth 500", [ast.parse(nested_expression(500))]
+    yield "nesting depth 2000", [ast.parse(nested_expression(2000))]
+
+
+def _time(fn, trees, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for tree in trees:
+            fn(tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'input':<26} {'nodes':>8} {'recursive':>14} {'iterative':>14} {'speedup':>8}")
+    for name, trees in _inputs():
+        nodes = sum(1 for tree in trees for _ in ast.walk(tree))
+        iterative = _time(_compact, trees, args.repeat)
+        try:
+            recursive = _time(_compact_recursive, trees, args.repeat)
+        except RecursionError:
+            recursive = None
+        rec_col = f"{nodes / recursive:>10,.0f} n/s" if recursive else f"{'RecursionError':>14}"
+        speedup = f"{recursive / iterative:>7.2f}x" if recursive else f"{'-':>8}"
+        print(f"{name:<26} {nodes:>8} {rec_col} {nodes / iterative:>10,.0f} n/s {speedup}")
+
+
+if __name__ == "__main__":
+    main()
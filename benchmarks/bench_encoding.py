@@ -0,0 +1,100 @@
+"""Size and throughput of the AST output encodings against the CLI's old output.
+
+Usage:
+    python -m benchmarks.bench_encoding [--repeat 5]
+
+The baseline is ``json.dumps(tree, indent=2)``, built in memory as the CLI
+used to do. Each format is written with `encoding.write` to a sink that
+discards the bytes, so the time covers walking and encoding only. Throughput
+is in compact-tree nodes per second; "peak" is the largest allocation held
+while encoding (tracemalloc), which for the streaming writer stays near the
+chunk size instead of growing with the output.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import time
+import tracemalloc
+
+from ast_service import parse_code
+from ast_service.encoding import FORMATS, write
+
+from .bench_compact import SNIPPETS_DIR, synthetic_module
+
+
+class _NullSink(io.RawIOBase):
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return len(b)
+
+
+def _inputs():
+    snippets = []
+    for path in sorted(glob.glob(os.path.join(SNIPPETS_DIR, "*.py"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            snippets.append(fh.read())
+    yield "code_snippets (all)", parse_code("\n".join(snippets))
+    yield "synthetic 10k statements", parse_code(synthetic_module())
+
+
+def _count_nodes(tree):
+    n = 0
+    stack = [tree]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            n += 1
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return n
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, tree in _inputs():
+        nodes = _count_nodes(tree)
+        baseline = lambda: json.dumps(tree, indent=2).encode("ascii")
+        base_size = len(baseline())
+        base_time = _time(baseline, args.repeat)
+
+        print(f"{name}: {nodes:,} nodes")
+        print(f"  {'format':<18} {'bytes':>11} {'size':>7} {'nodes/s':>12} {'speed':>7} {'peak KiB':>9}")
+        print(f"  {'json.dumps indent':<18} {base_size:>11,} {1:>6.2f}x {nodes / base_time:>12,.0f} "
+              f"{1:>6.2f}x {_peak(baseline) / 1024:>9,.0f}")
+        for fmt in FORMATS:
+            size = write(tree, _NullSink(), fmt)
+            elapsed = _time(lambda: write(tree, _NullSink(), fmt), args.repeat)
+            peak = _peak(lambda: write(tree, _NullSink(), fmt))
+            print(f"  {fmt:<18} {size:>11,} {size / base_size:>6.2f}x {nodes / elapsed:>12,.0f} "
+                  f"{base_time / elapsed:>6.2f}x {peak / 1024:>9,.0f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Speedup of parallel segment rendering versus worker count.
+
+Usage:
+    python -m benchmarks.bench_parallel_render --steps 40 --workers 1 2 4 8
+
+TTS is stubbed to a fixed duration so only rendering is measured. Each run
+uses a fresh output with no segment cache, so every segment is rendered.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from code_animator_poc import engine
+from code_animator_poc.segments import render_segmented
+from benchmarks.synthetic import stub_tts, synthetic_sequence
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    engine.config.verbosity = "WARNING"
+    engine.config.quality = "low_quality"
+    script = synthetic_sequence(args.steps)
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for workers in sorted(set(args.workers)):
+        with stub_tts(), tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            render_segmented(script, os.path.join(tmp, "out.mp4"), workers=workers)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Rendition ladder from one scene pass versus one full render per rendition.
+
+Usage:
+    python -m benchmarks.bench_renditions --steps 20 --renditions 1080p 720p 480p
+
+TTS is stubbed to a fixed duration. The independent renders each go through
+render_code_animation with a single rendition, i.e. the whole pipeline
+(scene construction, rasterization, encoding) once per resolution; the
+ladder rasterizes once at the top resolution and encodes every rendition
+in a single ffmpeg pass. The printed ratio is independent total / ladder;
+below 1 the ladder is the slower option for that script.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from code_animator_poc.engine import render_code_animation
+from benchmarks.synthetic import stub_tts, synthetic_sequence
+
+
+def _render(script, renditions):
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        render_code_animation(script, os.path.join(tmp, "out.mp4"), audio_cache_dir=None, renditions=renditions)
+        return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--renditions", nargs="+", default=["1080p", "720p", "480p"])
+    args = parser.parse_args(argv)
+
+    script = synthetic_sequence(args.steps)
+    with stub_tts():
+        independent = {name: _render(script, [name]) for name in args.renditions}
+        ladder = _render(script, args.renditions)
+
+    print(f"{'run':<24} {'seconds':>10}")
+    for name, seconds in independent.items():
+        print(f"{'independent ' + name:<24} {seconds:>10.2f}")
+    total = sum(independent.values())
+    print(f"{'independent total':<24} {total:>10.2f}")
+    print(f"{'ladder (one pass)':<24} {ladder:>10.2f}")
+    print(f"independent / ladder: {total / ladder:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""End-to-end pipeline benchmark suite with per-stage timings.
+
+Stages:
+- parse     parse_code throughput over ast_service/code_snippets, plus keyframe compilation
+- mobjects  DynamicStack / VarCreate mobject build cost, with the text cache cold and warm
+- render    full render cost per step for the keyframe files in assets/jsonFiles and for
+            synthetic sequences (10/100/1000 steps by default)
+
+TTS is stubbed to a fixed duration, so runs are offline and repeatable. The
+mobjects and render stages need manim and are skipped if it is missing.
+Results are written as JSON; pass --compare with an earlier results file to
+print the change per benchmark.
+
+Usage:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --stages parse mobjects --compare bench.json
+    python -m benchmarks.run --stages render --sizes 10 100
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import stub_tts, synthetic_sequence
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SNIPPETS_DIR = os.path.join(REPO_ROOT, "ast_service", "code_snippets")
+KEYFRAMES_DIR = os.path.join(REPO_ROOT, "code_animator_poc", "assets", "jsonFiles")
+STAGES = ("parse", "mobjects", "render")
+
+
+def _timed(fn, repeat=1):
+    """Best wall time of `repeat` calls to `fn`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _result(stage, name, seconds, items, unit):
+    return {
+        "stage": stage,
+        "name": name,
+        "seconds": seconds,
+        "items": items,
+        "unit": unit,
+        "per_item_ms": seconds / items * 1000 if items else None,
+    }
+
+
+def bench_parse(repeat):
+    from ast_service import parse_code
+    from code_animator_poc.keyframe_compiler import compile_keyframes
+
+    sources = []
+    for path in sorted(glob.glob(os.path.join(SNIPPETS_DIR, "*.py"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            sources.append(fh.read())
+    n_bytes = sum(len(s.encode("utf-8")) for s in sources)
+
+    seconds = _timed(lambda: [parse_code(s) for s in sources], repeat)
+    yield dict(_result("parse", "parse_code code_snippets", seconds, len(sources), "file"),
+               bytes_per_second=n_bytes / seconds)
+
+    trees = [parse_code(s) for s in sources]
+    seconds = _timed(lambda: [compile_keyframes(t, s) for t, s in zip(trees, sources)], repeat)
+    yield _result("parse", "compile_keyframes code_snippets", seconds, len(sources), "file")
+
+
+def bench_mobjects(repeat, count=50):
+    from code_animator_poc.engine import DynamicStack, VarCreate
+    from code_animator_poc.text_cache import TEXT_CACHE
+
+    def build_stacks():
+        for i in range(count):
+            DynamicStack(f"frame_{i % 5}()", capacity=10).generate_mobjects()
+
+    def build_vars():
+        stack = DynamicStack("Global Frame", capacity=count)
+        stack.generate_mobjects()
+        for i in range(count):
+            VarCreate(f"var_{i % 10}", i % 7, stack.get_slot_position(i)).generate_mobjects()
+
+    for name, fn in (("DynamicStack.generate_mobjects", build_stacks), ("VarCreate.generate_mobjects", build_vars)):
+        TEXT_CACHE.clear()
+        yield _result("mobjects", f"{name} (text cache cold)", _timed(fn), count, "mobject")
+        yield _result("mobjects", f"{name} (text cache warm)", _timed(fn, repeat), count, "mobject")
+
+
+def _render(script):
+    from code_animator_poc.engine import render_code_animation
+
+    with tempfile.TemporaryDirectory() as tmp:
+        return render_code_animation(script, os.path.join(tmp, "out.mp4"), audio_cache_dir=None)
+
+
+def bench_render(sizes):
+    with stub_tts():
+        for path in sorted(glob.glob(os.path.join(KEYFRAMES_DIR, "*.json"))):
+            with open(path, "r", encoding="utf-8") as fh:
+                script = json.load(fh)
+            steps = len(script.get("sequence", []))
+            if not steps:
+                # older keyframe drafts use a different ("frames") schema the engine doesn't read
+                continue
+            yield _result("render", f"render {os.path.basename(path)}", _timed(lambda: _render(script)), steps, "step")
+
+        for n in sizes:
+            script = synthetic_sequence(n)
+            yield _result("render", f"render synthetic {n} steps", _timed(lambda: _render(script)), n, "step")
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _print_table(results, previous=None):
+    before = {r["name"]: r for r in (previous or {}).get("results", [])}
+    print(f"{'stage':<9} {'benchmark':<48} {'seconds':>9} {'ms/item':>10} {'change':>8}")
+    for r in results:
+        per_item = f"{r['per_item_ms']:.2f}" if r["per_item_ms"] is not None else "-"
+        change = ""
+        old = before.get(r["name"])
+        if old and old.get("seconds"):
+            change = f"{(r['seconds'] / old['seconds'] - 1) * 100:+.1f}%"
+        print(f"{r['stage']:<9} {r['name']:<48} {r['seconds']:>9.4f} {per_item:>10} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pipeline benchmark suite")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Synthetic sequence lengths for the render stage")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats for the fast stages (best time is kept)")
+    parser.add_argument("--output", "-o", help="Write results JSON here")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    skipped = []
+    for stage in args.stages:
+        try:
+            if stage == "parse":
+                results.extend(bench_parse(args.repeat))
+            elif stage == "mobjects":
+                results.extend(bench_mobjects(args.repeat))
+            elif stage == "render":
+                results.extend(bench_render(args.sizes))
+        except ImportError as e:
+            skipped.append({"stage": stage, "reason": str(e)})
+
+    report = {"meta": _metadata(), "results": results, "skipped": skipped}
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            previous = json.load(fh)
+
+    _print_table(results, previous)
+    for s in skipped:
+        print(f"skipped {s['stage']}: {s['reason']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
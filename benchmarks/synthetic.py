@@ -0,0 +1,43 @@
+"""Shared fixtures for benchmarks: synthetic keyframe scripts and a TTS stub."""
+import contextlib
+
+# Fixed narration length used when TTS is stubbed, in seconds
+STUB_AUDIO_SECONDS = 2.0
+
+
+def synthetic_sequence(n_steps, vars_per_scope=5):
+    """Return a `{"sequence": [...]}` script with `n_steps` VarCreate steps.
+
+    A new scope starts every `vars_per_scope` variables so stack frame
+    creation is exercised along with variable creation.
+    """
+    sequence = []
+    for i in range(n_steps):
+        scope = "Global Frame" if i < vars_per_scope else f"frame_{i // vars_per_scope}()"
+        name = f"var_{i}"
+        sequence.append({
+            "type": "VarCreate",
+            "code": f"{name} = {i}",
+            "narration": f"We set {name} to {i}.",
+            "params": {"name": name, "value": i, "type": "int", "scope": scope},
+        })
+    return {"sequence": sequence}
+
+
+def _stub_audio(self, text, step_index):
+    if not text or not text.strip():
+        return None, 0
+    return None, STUB_AUDIO_SECONDS
+
+
+@contextlib.contextmanager
+def stub_tts():
+    """Replace gTTS synthesis with a fixed duration so runs are offline and repeatable."""
+    from code_animator_poc import engine
+
+    original = engine.TTSService.generate_audio
+    engine.TTSService.generate_audio = _stub_audio
+    try:
+        yield
+    finally:
+        engine.TTSService.generate_audio = original
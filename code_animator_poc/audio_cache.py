@@ -0,0 +1,191 @@
+"""Persistent, content-addressed cache for narration audio.
+
+Each entry is stored as two files inside the cache directory:
+
+- ``<key>.mp3``  the synthesized audio
+- ``<key>.json`` metadata (measured duration, text, language, backend)
+
+The key is a SHA-256 of (text, language, backend), so the same narration is
+only ever synthesized once. Recency is tracked through the audio file's mtime
+(touched on every hit), which keeps the cache safe to share between threads and
+processes without a central index. When the total size grows past
+``max_bytes`` the least recently used entries are evicted.
+
+Entries are written into the cache directory under temp names and renamed
+into place, and an existing entry is never rewritten, so readers in other
+processes never see a partial file. Eviction takes a lock file shared by all
+processes and spares entries used within the last ``evict_grace`` seconds,
+since another render may hold a path it got from the cache but not have
+read it yet.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is only serialized within the process
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vidgen", "tts")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Long enough for a render to use the audio it was handed at its start
+DEFAULT_EVICT_GRACE = 60 * 60
+
+
+class AudioCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, evict_grace=DEFAULT_EVICT_GRACE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.evict_grace = evict_grace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Rough running total so we only scan the directory when we might be over budget
+        self._approx_bytes = self._scan_size()
+
+    @staticmethod
+    def make_key(text, lang="en", backend="gtts"):
+        payload = json.dumps([backend, lang, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _audio_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return ``(audio_path, duration)`` for a cached entry, or None on a miss."""
+        audio_path = self._audio_path(key)
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as fh:
+                duration = json.load(fh)["duration"]
+            # Mark as recently used
+            os.utime(audio_path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return audio_path, duration
+
+    def duration(self, key):
+        """Cached duration for ``key`` (or None), without counting a lookup or marking it used."""
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as fh:
+                return json.load(fh)["duration"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _tmp_path(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def put(self, key, src_path, duration, **meta):
+        """Move ``src_path`` into the cache and return the cached audio path.
+
+        If ``key`` is already cached (e.g. put by another process meanwhile)
+        the entry is left alone, ``src_path`` is not touched and the existing
+        audio path is returned.
+        """
+        audio_path = self._audio_path(key)
+        if os.path.exists(self._meta_path(key)):
+            try:
+                os.utime(audio_path)
+                return audio_path
+            except OSError:
+                pass  # evicted in between: write it again
+
+        tmp_audio = self._tmp_path(audio_path)
+        try:
+            # A rename when the workspace shares the cache's filesystem, a copy otherwise
+            os.rename(src_path, tmp_audio)
+        except OSError:
+            shutil.copyfile(src_path, tmp_audio)
+            os.remove(src_path)
+        os.replace(tmp_audio, audio_path)
+        os.utime(audio_path)
+        meta = dict(meta, duration=duration)
+        tmp_meta = self._tmp_path(self._meta_path(key))
+        with open(tmp_meta, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False)
+        # Metadata is written last and atomically: its presence marks the entry complete
+        os.replace(tmp_meta, self._meta_path(key))
+
+        with self._lock:
+            self._approx_bytes += os.path.getsize(audio_path)
+            over_budget = self._approx_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return audio_path
+
+    def _entries(self):
+        """Yield ``(mtime, size, key)`` for every complete entry on disk."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            yield st.st_mtime, st.st_size, name[:-4]
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``.
+
+        Entries used within ``evict_grace`` seconds are kept even if the cache
+        stays over budget.
+        """
+        with self._lock, open(os.path.join(self.cache_dir, ".evict.lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            cutoff = time.time() - self.evict_grace
+            for mtime, size, key in entries:
+                if total <= self.max_bytes or mtime > cutoff:
+                    break
+                for path in (self._meta_path(key), self._audio_path(key)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                self.evictions += 1
+            self._approx_bytes = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, key in list(self._entries()):
+                for path in (self._meta_path(key), self._audio_path(key)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            self._approx_bytes = 0
+
+    def stats(self):
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,91 @@
+"""Render many keyframe scripts concurrently.
+
+Each job runs in a worker process with its own temporary workspace and manim
+config (see `render_code_animation`) and writes to its own output path, so any
+number of jobs can run side by side on one machine. Jobs need the separate
+processes: manim's config and the text cache are process-global, so renders
+on threads of one process only run one at a time.
+
+Usage:
+    python -m code_animator_poc.batch scripts/*.json --output-dir videos --jobs 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Optional
+
+from .audio_cache import DEFAULT_CACHE_DIR
+
+
+class RenderResult(NamedTuple):
+    input_path: str
+    output_path: str
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def _render_job(input_path, output_path, options):
+    start = time.perf_counter()
+    try:
+        # Imported in the worker so the parent never loads the rendering stack
+        from .engine import render_code_animation
+
+        with open(input_path, "r", encoding="utf-8") as fh:
+            json_input = fh.read()
+        video = render_code_animation(json_input, output_path, **options)
+        error = None if video else "no video produced"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return RenderResult(input_path, os.path.abspath(output_path), error is None, time.perf_counter() - start, error)
+
+
+def render_batch(jobs, workers=None, **options):
+    """Render `(input_path, output_path)` jobs on a process pool.
+
+    Extra keyword arguments are passed through to `render_code_animation`.
+    Yields a `RenderResult` per job as soon as it finishes; a failing job is
+    reported in its result and never stops the rest of the batch.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_job, src, dst, options) for src, dst in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render keyframe JSON files to videos concurrently")
+    parser.add_argument("inputs", nargs="+", help="Keyframe JSON files to render")
+    parser.add_argument("--output-dir", "-o", default=".", help="Directory for the rendered videos (default: .)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Number of parallel renders (default: CPU count)")
+    parser.add_argument("--audio-cache", default=DEFAULT_CACHE_DIR, help="Shared narration audio cache directory")
+    parser.add_argument("--no-audio-cache", action="store_true", help="Synthesize all narration from scratch")
+    parser.add_argument("--layout", choices=["faststart", "fragmented"], default=None,
+                        help="MP4 layout of the videos (default: as encoded)")
+    args = parser.parse_args(argv)
+
+    jobs = []
+    for path in args.inputs:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        jobs.append((path, os.path.join(args.output_dir, f"{stem}.mp4")))
+    outputs = [dst for _, dst in jobs]
+    if len(set(outputs)) != len(outputs):
+        parser.error("input files must have distinct names; their videos would overwrite each other")
+
+    audio_cache_dir = None if args.no_audio_cache else args.audio_cache
+    failures = 0
+    for result in render_batch(jobs, workers=args.jobs, audio_cache_dir=audio_cache_dir, layout=args.layout):
+        if result.ok:
+            print(f"OK    {result.input_path} -> {result.output_path} ({result.seconds:.1f}s)")
+        else:
+            failures += 1
+            print(f"FAIL  {result.input_path}: {result.error} ({result.seconds:.1f}s)")
+
+    print(f"{len(jobs) - failures}/{len(jobs)} rendered")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Render-free dry run: the timeline and final layout of a script, without manim.
+
+Replays the engine's step loop on `LayoutState` plus a geometric model of
+`DynamicStack`, so nothing is built, rasterized or encoded. For every step it
+reports start, end and duration, using the narration length from the audio
+cache when the text has been synthesized before and a words-per-second
+estimate otherwise. It also reports where each variable ends up and which
+stacks or slots run off the top or bottom of the frame.
+
+Usage:
+    python -m code_animator_poc.dryrun code_animator_poc/assets/jsonFiles/keyframes1401.json
+    python -m code_animator_poc.dryrun script.json --json
+"""
+import argparse
+import json
+import sys
+
+from .audio_cache import DEFAULT_CACHE_DIR, AudioCache
+from .layout import DEFAULT_VISIBLE_SLOTS, LayoutState, is_stream, iter_steps
+from .plan import Plan, PlanError, compile_plan, compile_step
+
+# Timing, as in CodeAnimatorEngine.play_step
+PLAY_SECONDS = 1.5
+WAIT_BUFFER = 0.1
+# gTTS speaks at roughly 150 words per minute
+WORDS_PER_SECOND = 2.5
+
+# manim's default frame is 8 units high, centered on the origin
+FRAME_TOP = 4.0
+FRAME_BOTTOM = -4.0
+
+
+def step_seconds(audio_seconds):
+    """On-screen time of one step: the 1.5s play, then the rest of the narration plus a buffer."""
+    return PLAY_SECONDS + max(audio_seconds - PLAY_SECONDS, 0) + WAIT_BUFFER
+
+
+def estimate_audio_seconds(text):
+    if not text or not text.strip():
+        return 0
+    return max(len(text.split()) / WORDS_PER_SECOND, 0.5)
+
+
+class StackGeometry:
+    """The geometry of a `DynamicStack`, without mobjects."""
+
+    var_height = 1.0
+    var_spacing = 0.2
+    header_height = 0.8
+    padding = 0.5
+    center = (3.5, 0.0)
+    anchor_bottom = -3.0
+
+    def __init__(self, frame_name, capacity=3, growable=False):
+        self.frame_name = frame_name
+        self.capacity = max(capacity, 1)
+        if growable:
+            self.bottom = self.anchor_bottom
+        else:
+            self.bottom = self.center[1] - self.total_height / 2
+
+    @property
+    def total_height(self):
+        content = self.capacity * self.var_height + (self.capacity - 1) * self.var_spacing
+        return content + self.header_height + self.padding * 2
+
+    @property
+    def top(self):
+        return self.bottom + self.total_height
+
+    def ensure_capacity(self, count):
+        # The bottom stays put, as in DynamicStack.ensure_capacity
+        self.capacity = max(self.capacity, count)
+
+    def slot_position(self, index):
+        y = self.bottom + self.padding + self.var_height / 2 + index * (self.var_height + self.var_spacing)
+        return self.center[0], y
+
+
+class _AudioDurations:
+    def __init__(self, cache, lang, backend):
+        self.cache = cache
+        self.lang = lang
+        self.backend = backend
+
+    def lookup(self, text):
+        """Return (seconds, source) with source one of "none", "cache", "estimate"."""
+        if not text or not text.strip():
+            return 0, "none"
+        if self.cache is not None:
+            duration = self.cache.duration(self.cache.make_key(text, self.lang, self.backend))
+            if duration is not None:
+                return duration, "cache"
+        return estimate_audio_seconds(text), "estimate"
+
+
+def _slot_overflow(step, stack, name, y):
+    if y + stack.var_height / 2 > FRAME_TOP:
+        return {"step": step, "kind": "slot", "scope": stack.frame_name, "name": name,
+                "edge": "top", "by": y + stack.var_height / 2 - FRAME_TOP}
+    return None
+
+
+def plan_timeline(script_data, audio_cache=None, lang="en", backend="gtts", visible_slots=DEFAULT_VISIBLE_SLOTS):
+    """Dry-run `script_data` and return its timeline, final layout and overflows.
+
+    With `visible_slots` set (as given to the engine) every frame has that many slots
+    and "slots" is the active frame's final visible window. With None every
+    variable keeps its slot; scripts given as iterators are then planned with
+    growable stacks, as the engine plays them. Iterators are consumed.
+
+    Scripts are validated as the engine does: a complete script up front and a
+    streamed one step by step, raising `plan.PlanError` on a bad step.
+    """
+    streaming = is_stream(script_data) and not isinstance(script_data, Plan)
+    if streaming:
+        steps = (compile_step(step, i).as_dict() for i, step in enumerate(iter_steps(script_data)))
+        total_vars = None
+    else:
+        plan = compile_plan(script_data)
+        steps = plan.sequence()
+        total_vars = plan.total_vars
+    durations = _AudioDurations(audio_cache, lang, backend)
+
+    state = LayoutState()
+    stacks = []
+    slots = []
+    timeline = []
+    overflows = []
+    clock = 0.0
+    for i, step in enumerate(steps):
+        audio, source = durations.lookup(step.get("narration", ""))
+        seconds = step_seconds(audio)
+        timeline.append({
+            "step": i,
+            "type": step.get("type", ""),
+            "start": clock,
+            "end": clock + seconds,
+            "duration": seconds,
+            "audio": audio,
+            "audio_source": source,
+        })
+        clock += seconds
+
+        n_stacks = len(state.stacks)
+        idx = len(state.variables)
+        state.apply(step)
+        if len(state.variables) == idx:
+            continue
+
+        if visible_slots:
+            if len(state.stacks) > n_stacks:
+                stacks.append(StackGeometry(state.active_stack, capacity=visible_slots))
+            continue
+
+        if len(state.stacks) > n_stacks:
+            if total_vars is None:
+                stacks.append(StackGeometry(state.active_stack, capacity=idx + 1, growable=True))
+            else:
+                stacks.append(StackGeometry(state.active_stack, capacity=total_vars))
+            if stacks[-1].bottom < FRAME_BOTTOM:
+                overflows.append({"step": i, "kind": "stack", "scope": state.active_stack,
+                                  "edge": "bottom", "by": FRAME_BOTTOM - stacks[-1].bottom})
+        stack = stacks[-1]
+        stack.ensure_capacity(idx + 1)
+
+        name, value = state.variables[-1]
+        x, y = stack.slot_position(idx)
+        slots.append({"slot": idx, "name": name, "value": value, "scope": stack.frame_name, "x": x, "y": y})
+        overflow = _slot_overflow(i, stack, name, y)
+        if overflow:
+            overflows.append(overflow)
+
+    if visible_slots and stacks:
+        stack = stacks[-1]
+        for idx, (name, value) in enumerate(state.visible_variables(visible_slots)):
+            x, y = stack.slot_position(idx)
+            slots.append({"slot": idx, "name": name, "value": value, "scope": stack.frame_name, "x": x, "y": y})
+            overflow = _slot_overflow(None, stack, name, y)
+            if overflow:
+                overflows.append(overflow)
+
+    for stack in stacks:
+        if stack.top > FRAME_TOP:
+            overflows.append({"step": None, "kind": "stack", "scope": stack.frame_name,
+                              "edge": "top", "by": stack.top - FRAME_TOP})
+
+    return {
+        "duration": clock,
+        "steps": timeline,
+        "slots": slots,
+        "stacks": [{"scope": s.frame_name, "capacity": s.capacity, "bottom": s.bottom, "top": s.top} for s in stacks],
+        "overflows": overflows,
+    }
+
+
+def format_timeline(plan):
+    lines = [f"{'step':>5} {'type':<12} {'start':>8} {'end':>8} {'audio':>7} {'source':<8}"]
+    for row in plan["steps"]:
+        lines.append(f"{row['step']:>5} {row['type']:<12} {row['start']:>8.2f} {row['end']:>8.2f} "
+                     f"{row['audio']:>7.2f} {row['audio_source']:<8}")
+    lines.append(f"Total duration: {plan['duration']:.2f}s over {len(plan['steps'])} steps")
+    for o in plan["overflows"]:
+        where = f"step {o['step']}" if o["step"] is not None else "final layout"
+        what = f"variable {o['name']} in {o['scope']}" if o["kind"] == "slot" else f"stack {o['scope']}"
+        lines.append(f"OVERFLOW ({where}): {what} extends {o['by']:.2f} units past the {o['edge']} of the frame")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan a keyframe script's timeline and layout without rendering")
+    parser.add_argument("input", help="Keyframe JSON or NDJSON file ('-' for stdin)")
+    parser.add_argument("--audio-cache", default=DEFAULT_CACHE_DIR, help="Narration audio cache to take durations from")
+    parser.add_argument("--no-audio-cache", action="store_true", help="Estimate every narration's duration")
+    parser.add_argument("--visible-slots", type=int, default=DEFAULT_VISIBLE_SLOTS or 0,
+                        help="Variables shown per frame, e.g. 4 (default: 0 = all)")
+    parser.add_argument("--json", action="store_true", help="Print the full plan as JSON")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        script = sys.stdin.read()
+    else:
+        with open(args.input, "r", encoding="utf-8") as fh:
+            script = fh.read()
+    cache = None if args.no_audio_cache else AudioCache(args.audio_cache)
+    try:
+        plan = plan_timeline(script, audio_cache=cache, visible_slots=args.visible_slots or None)
+    except PlanError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.json:
+        json.dump(plan, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(format_timeline(plan))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
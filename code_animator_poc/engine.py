@@ -1,35 +1,106 @@
 from manim import *
-import json
+import math
 import os
 import shutil
-import glob
+import tempfile
+import threading
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
 from mutagen.mp3 import MP3
+from .audio_cache import AudioCache, DEFAULT_CACHE_DIR
+from .ffmpeg import encode_renditions, remux, repeat_frame
+from .narration import NarrationTrack
+from .renditions import LADDER_FRAME_RATE, rendition_paths, resolve_renditions
+from .layout import DEFAULT_SCOPE, DEFAULT_VISIBLE_SLOTS, is_stream, iter_steps
+from .plan import Action, Plan, as_plan_step, compile_plan, compile_step
+from .text_cache import TEXT_CACHE, make_text
+from .tracing import NULL_TRACER, Tracer
+
+# Shorter waits are rendered normally; below this an ffmpeg call costs more than the frames it saves
+HOLD_MIN_SECONDS = 1.0
+# manim's config and the text cache are process-global: renders on threads of one process take turns
+_RENDER_LOCK = threading.Lock()
 
 # ==========================================
 # 0. HELPER: TTS SERVICE
 # ==========================================
 class TTSService:
+    backend = "gtts"
+
+    def __init__(self, lang='en', cache=None, output_dir=".", tracer=None):
+        self.lang = lang
+        self.cache = cache
+        self.output_dir = output_dir
+        self.tracer = tracer or NULL_TRACER
+
     def generate_audio(self, text, step_index):
         if not text or not text.strip():
             return None, 0
-        filename = f"voiceover_{step_index}.mp3"
+        with self.tracer.span("tts", step=step_index) as span:
+            path, duration = self._generate_audio(text, step_index, span)
+            span.set(duration=duration)
+        return path, duration
+
+    def _generate_audio(self, text, step_index, span):
+        # Unchanged narration is served from the cache without any synthesis
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(text, self.lang, self.backend)
+            cached = self.cache.get(key)
+            span.set(cached=bool(cached))
+            if cached:
+                return cached
+
+        filename = os.path.join(self.output_dir, f"voiceover_{step_index}.mp3")
         try:
-            tts = gTTS(text=text, lang='en')
+            tts = gTTS(text=text, lang=self.lang)
             tts.save(filename)
             audio = MP3(filename)
-            return filename, audio.info.length
-        except Exception:
-            return filename, 2.0 
+            duration = audio.info.length
+        except Exception as e:
+            # Fall back to a fixed duration; only hand back the file if it was written
+            span.set(error=type(e).__name__)
+            return (filename if os.path.exists(filename) else None), 2.0
+
+        if self.cache is not None:
+            filename = self.cache.put(key, filename, duration, text=text, lang=self.lang, backend=self.backend)
+        return filename, duration
+
+    def prefetch(self, texts, max_workers=4):
+        """Synthesize all narrations concurrently on a bounded thread pool.
+
+        Returns a dict of step index -> (audio_path, duration). Steps without
+        narration are omitted; a failing step falls back on its own without
+        affecting the rest of the batch. A text repeated across steps is
+        synthesized once and every one of its steps gets the same audio.
+        """
+        steps = {}
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                steps.setdefault(text, []).append(i)
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            # Named after the first step that uses the text
+            futures = {text: pool.submit(self.generate_audio, text, indices[0]) for text, indices in steps.items()}
+        results = {}
+        for text, future in futures.items():
+            try:
+                audio = future.result()
+            except Exception:
+                audio = (None, 2.0)
+            for i in steps[text]:
+                results[i] = audio
+        return results
 
 # ==========================================
 # 1. LEGO BLOCK: DynamicStack
 # ==========================================
 class DynamicStack:
-    def __init__(self, frame_name="Global Frame", capacity=3):
+    def __init__(self, frame_name="Global Frame", capacity=3, growable=False):
         self.frame_name = frame_name
-        self.capacity = max(capacity, 1)
+        # Growable stacks are anchored at the bottom and extend upward as slots are added
+        self.growable = growable
         
         # Dimensions
         self.var_height = 1.0
@@ -38,16 +109,24 @@ class DynamicStack:
         self.padding = 0.5
         
         # Calculate total height based on capacity
-        self.content_height = (self.capacity * self.var_height) + ((self.capacity - 1) * self.var_spacing)
-        self.total_height = self.content_height + self.header_height + (self.padding * 2)
+        self._set_capacity(capacity)
         
         self.width = 4.5
         self.center_point = RIGHT * 3.5 
+        self.bottom_point = self.center_point + DOWN * 3.0
+
+    def _set_capacity(self, capacity):
+        self.capacity = max(capacity, 1)
+        self.content_height = (self.capacity * self.var_height) + ((self.capacity - 1) * self.var_spacing)
+        self.total_height = self.content_height + self.header_height + (self.padding * 2)
 
     def generate_mobjects(self):
         # 1. Frame
         self.rect = Rectangle(height=self.total_height, width=self.width, color=WHITE)
-        self.rect.move_to(self.center_point)
+        if self.growable:
+            self.rect.move_to(self.bottom_point, aligned_edge=DOWN)
+        else:
+            self.rect.move_to(self.center_point)
         
         # 2. Header Background
         self.header_bg = Rectangle(height=self.header_height, width=self.width, color=WHITE)
@@ -58,13 +137,32 @@ class DynamicStack:
         self.header_bg.move_to(header_pos)
 
         # 3. Header Text
-        self.label = Text(self.frame_name, font_size=24, color=WHITE)
+        self.label = make_text(self.frame_name, font_size=24, color=WHITE)
         self.label.move_to(self.header_bg.get_center())
 
         return VGroup(self.rect, self.header_bg, self.label)
 
     def get_animations(self):
         return [Create(self.rect), FadeIn(self.header_bg), Write(self.label)]
+
+    def ensure_capacity(self, count):
+        """Grow the frame upward to hold `count` slots; returns the animations (none if it already fits).
+
+        The bottom edge stays where it is, so variables already in their slots don't move.
+        """
+        if count <= self.capacity:
+            return []
+        bottom = self.rect.get_bottom()
+        self._set_capacity(count)
+
+        new_rect = Rectangle(height=self.total_height, width=self.width, color=WHITE)
+        new_rect.move_to(bottom, aligned_edge=DOWN)
+        header_pos = new_rect.get_top() + (DOWN * (self.header_height / 2))
+        return [
+            Transform(self.rect, new_rect),
+            self.header_bg.animate.move_to(header_pos),
+            self.label.animate.move_to(header_pos),
+        ]
     
     def get_slot_position(self, index):
         # Calculate Y position (Bottom Up)
@@ -92,13 +190,13 @@ class VarCreate:
         self.box.move_to(self.target_pos)
 
         # 2. Name Label (Auto-Scaling)
-        self.label = Text(self.name, font_size=24, color=YELLOW)
+        self.label = make_text(self.name, font_size=24, color=YELLOW)
         if self.label.width > 1.6:
             self.label.scale_to_fit_width(1.6)
         self.label.next_to(self.box.get_left(), RIGHT, buff=0.2)
 
         # 3. Value Label (Auto-Scaling)
-        self.value_text = Text(self.value, font_size=24, color=WHITE)
+        self.value_text = make_text(self.value, font_size=24, color=WHITE)
         if self.value_text.width > 1.6:
             self.value_text.scale_to_fit_width(1.6)
         self.value_text.next_to(self.box.get_right(), LEFT, buff=0.2)
@@ -108,149 +206,554 @@ class VarCreate:
     def get_animations(self):
         return [FadeIn(self.box, shift=RIGHT), FadeIn(self.label, shift=RIGHT), Write(self.value_text)]
 
+# ==========================================
+# 2b. LEGO BLOCK: VarUpdate
+# ==========================================
+class VarUpdate:
+    """Changes the value shown in an existing VarCreate block; the box and name stay put."""
+
+    def __init__(self, var_mobjects, value):
+        # The VGroup(box, label, value_text) built by VarCreate
+        self.var_mobjects = var_mobjects
+        self.value = str(value)
+
+    def generate_mobjects(self):
+        box = self.var_mobjects[0]
+        self.value_text = make_text(self.value, font_size=24, color=WHITE)
+        if self.value_text.width > 1.6:
+            self.value_text.scale_to_fit_width(1.6)
+        self.value_text.next_to(box.get_right(), LEFT, buff=0.2)
+        return self.value_text
+
+    def get_animations(self):
+        return [Transform(self.var_mobjects[2], self.value_text)]
+
+# ==========================================
+# 2c. LEGO BLOCK: VirtualStack
+# ==========================================
+class VirtualStack:
+    """A stack frame that keeps only its newest `visible_slots` variables on screen.
+
+    Once the window is full, each new variable scrolls the others down one slot
+    and retires the oldest one, so a frame never holds more than
+    `visible_slots` variable mobjects however many are created in it.
+    """
+
+    def __init__(self, frame_name, visible_slots):
+        self.frame_name = frame_name
+        self.frame = DynamicStack(frame_name, capacity=visible_slots)
+        self.visible_slots = self.frame.capacity
+        # One VGroup per visible variable, bottom (oldest) slot first
+        self.slots = []
+        # name -> its VGroup, for the variables still in the window
+        self.index = {}
+
+    def generate_mobjects(self, variables=()):
+        """Build the frame plus the newest of `variables` ((name, value) pairs) in their slots."""
+        frame = self.frame.generate_mobjects()
+        for idx, (name, value) in enumerate(variables[-self.visible_slots:]):
+            block = VarCreate(name, value, self.frame.get_slot_position(idx)).generate_mobjects()
+            self.slots.append(block)
+            self.index[name] = block
+        return VGroup(frame, *self.slots)
+
+    def get_animations(self):
+        return self.frame.get_animations() + [FadeIn(block) for block in self.slots]
+
+    def push(self, name, value):
+        """Animations adding a variable in the next free slot, scrolling if the window is full."""
+        animations = []
+        if len(self.slots) == self.visible_slots:
+            oldest = self.slots.pop(0)
+            for old_name, block in list(self.index.items()):
+                if block is oldest:
+                    del self.index[old_name]
+            animations.append(FadeOut(oldest, shift=DOWN * 0.5))
+            one_slot_down = self.frame.get_slot_position(0) - self.frame.get_slot_position(1)
+            animations.extend(block.animate.shift(one_slot_down) for block in self.slots)
+
+        var_block = VarCreate(name, value, self.frame.get_slot_position(len(self.slots)))
+        block = var_block.generate_mobjects()
+        self.slots.append(block)
+        self.index[name] = block
+        animations.extend(var_block.get_animations())
+        return animations
+
+    def retire(self):
+        """Animations fading the whole frame out; FadeOut also removes it from the scene."""
+        return [FadeOut(VGroup(self.frame.rect, self.frame.header_bg, self.frame.label, *self.slots))]
+
 # ==========================================
 # 3. THE SCENE: CodeAnimatorEngine
 # ==========================================
 class CodeAnimatorEngine(Scene):
-    def __init__(self, script_data, **kwargs):
+    def __init__(self, script_data, audio_cache=None, tts_concurrency=4, audio_dir=".", tracer=None,
+                 visible_slots=DEFAULT_VISIBLE_SLOTS, hold_waits=False, premix_audio=True, **kwargs):
         self.script_data = script_data
-        self.tts = TTSService()
+        self.tracer = tracer or NULL_TRACER
+        # None keeps every frame and variable on screen (unbounded scene graph)
+        self.visible_slots = visible_slots
+        # Render narration waits as one frame extended with ffmpeg (see hold())
+        self.hold_waits = hold_waits
+        # Collect narration into one track muxed at the end instead of one add_sound per step
+        self.premix_audio = premix_audio
+        self.narration = NarrationTrack()
+        self.tts = TTSService(cache=audio_cache, output_dir=audio_dir, tracer=self.tracer)
+        self.tts_concurrency = tts_concurrency
         super().__init__(**kwargs)
 
     def construct(self):
-        # Data Loading
-        if isinstance(self.script_data, str):
-            data = json.loads(self.script_data)
+        if is_stream(self.script_data) and not isinstance(self.script_data, Plan):
+            self.play_stream()
         else:
-            data = self.script_data
-        
-        script_sequence = data.get("sequence", [])
+            self.play_script()
+        self.mix_narration()
+
+        # Everything scene.render() does after this point is encoding
+        self.construct_finished = time.perf_counter()
 
+    def play_script(self):
+        """Play a complete script: stacks are sized and narration synthesized up front."""
+        # Data Loading
+        with self.tracer.span("load"):
+            # Validated up front; total_vars sizes the stack correctly (Scalability prep)
+            plan = compile_plan(self.script_data)
+            script_sequence = plan.steps
+            total_vars = plan.total_vars
+
+        with self.tracer.span("setup_ui"):
+            self.setup_ui()
+
+        # Synthesize every narration up front so the loop below never waits on TTS
+        with self.tracer.span("tts.prefetch", steps=len(script_sequence)):
+            narrations = self.tts.prefetch(
+                [step.narration for step in script_sequence],
+                max_workers=self.tts_concurrency,
+            )
+
+        # --- EXECUTION LOOP ---
+        for i, step in enumerate(script_sequence):
+            with self.tracer.span("step", step=i, action=step.type) as span:
+                self.play_step(step, narrations.get(i, (None, 0)), total_vars)
+                span.set(mobjects=len(self.mobjects))
+
+    def play_stream(self):
+        """Play steps as they arrive from an iterator or NDJSON stream.
+
+        Nothing is known about the steps still to come, so narration is
+        synthesized per step and unwindowed stacks grow as variables are added. The first
+        step is on screen as soon as it has been received.
+        """
+        self.setup_ui()
+        for i, step in enumerate(iter_steps(self.script_data)):
+            # Each step is validated as it arrives; a bad one stops the stream there
+            step = compile_step(step, i)
+            with self.tracer.span("step", step=i, action=step.type) as span:
+                audio = self.tts.generate_audio(step.narration, i)
+                self.play_step(step, audio, None)
+                span.set(mobjects=len(self.mobjects))
+
+    def setup_ui(self, state=None, total_vars=0):
+        """Build the static UI, optionally restoring a mid-script `LayoutState`."""
         # --- SETUP UI ---
-        code_header = Text("Current Instruction:", font_size=24, color=GRAY)
-        code_header.to_edge(UP, buff=0.5).to_edge(LEFT, buff=1.0)
-        
-        current_code_line = Text("Initializing...", font="Monospace", font_size=28)
-        current_code_line.next_to(code_header, DOWN).align_to(code_header, LEFT)
-        
-        subtitle = Text("", font_size=28, color=WHITE).to_edge(DOWN, buff=1.0)
+        self.code_header = make_text("Current Instruction:", font_size=24, color=GRAY)
+        self.code_header.to_edge(UP, buff=0.5).to_edge(LEFT, buff=1.0)
+
+        if state is None or state.code is None:
+            self.current_code_line = make_text("Initializing...", font="Monospace", font_size=28)
+        else:
+            self.current_code_line = make_text(state.code, font="Monospace", font_size=28, color=GREEN)
+        self.current_code_line.next_to(self.code_header, DOWN).align_to(self.code_header, LEFT)
+
+        if state is None:
+            self.subtitle = make_text("", font_size=28, color=WHITE).to_edge(DOWN, buff=1.0)
+        else:
+            self.subtitle = make_text(state.subtitle, font_size=24, color=WHITE).to_edge(DOWN, buff=1.0)
+
+        self.add(self.code_header, self.current_code_line, self.subtitle)
 
-        self.add(code_header, current_code_line, subtitle)
-        
         # --- STATE TRACKING ---
         self.variables_on_screen = [] 
         self.active_stack = None       
+        # Per frame: name -> the VGroup drawn for it (without a visible-slot window)
+        self.var_blocks = {}
+        # Every variable created so far per scope, as data, so a re-entered frame can be redrawn,
+        # and per frame: name -> its index in that list (with a visible-slot window)
+        self.scope_variables = {}
+        self.slot_index = {}
+
+        if state is not None and self.visible_slots:
+            for (name, value), scope in zip(state.variables, state.variable_scopes):
+                scope_vars = self.scope_variables.setdefault(scope, [])
+                self.slot_index.setdefault(scope, {})[name] = len(scope_vars)
+                scope_vars.append((name, value))
+            if state.active_stack is not None:
+                self.active_stack = VirtualStack(state.active_stack, self.visible_slots)
+                self.add(self.active_stack.generate_mobjects(self.scope_variables[state.active_stack]))
+        elif state is not None:
+            # Re-create stacks and variables in place, without animating them
+            for frame_name in state.stacks:
+                self.active_stack = DynamicStack(frame_name, capacity=total_vars)
+                self.add(self.active_stack.generate_mobjects())
+            for idx, ((name, value), scope) in enumerate(zip(state.variables, state.variable_scopes)):
+                var_block = VarCreate(name, value, self.active_stack.get_slot_position(idx))
+                mobjects = var_block.generate_mobjects()
+                self.variables_on_screen.append(mobjects)
+                self.var_blocks.setdefault(scope, {})[name] = mobjects
+                self.add(mobjects)
 
-        # Count total vars to size the stack correctly (Scalability prep)
-        total_vars = sum(1 for step in script_sequence if step.get("type") == "VarCreate")
+    def play_step(self, step, audio, total_vars):
+        """Animate a single keyframe step (a `PlanStep` or keyframe dict); `audio` is its (audio_path, duration).
 
-        # --- EXECUTION LOOP ---
-        for i, step in enumerate(script_sequence):
-            
-            # Common Data
-            code_text = step.get("code", "")
-            narration_text = step.get("narration", "")
-            action_type = step.get("type", "")
-            params = step.get("params", {})
-            
-            # 1. Audio Generation
-            audio_path, audio_duration = self.tts.generate_audio(narration_text, i)
-            if audio_path: self.add_sound(audio_path)
-
-            # 2. Text Updates
-            new_code = Text(code_text, font="Monospace", font_size=28, color=GREEN)
-            new_code.next_to(code_header, DOWN).align_to(code_header, LEFT)
-            new_subtitle = Text(narration_text, font_size=24, color=WHITE).to_edge(DOWN, buff=1.0)
-            
-            # Base animations (Text changes)
-            animations = [
-                Transform(current_code_line, new_code),
-                Transform(subtitle, new_subtitle)
-            ]
-            
-            # ====================================================
-            # SCALABLE LOGIC BLOCK
-            # ====================================================
-
-            if action_type == "VarCreate":
-                # A. Detect Scope Change
-                target_scope = params.get("scope", "Global Frame")
-                
-                # If stack doesn't exist OR name doesn't match current scope -> Create New Stack Frame
-                if not self.active_stack or self.active_stack.frame_name != target_scope:
-                    
-                    # Create new stack visual
-                    self.active_stack = DynamicStack(target_scope, capacity=total_vars)
+        Without a visible-slot window, `total_vars` sizes new stack frames and
+        None (streaming) makes them growable.
+        """
+        # Common Data
+        step = as_plan_step(step)
+        code_text = step.code
+        narration_text = step.narration
+        action = step.action
+        params = step.params
+
+        # Updating a name its frame has never seen: draw it as a new variable
+        if action == Action.VAR_UPDATE and not self.is_defined(params):
+            action = Action.VAR_CREATE
+
+        # 1. Audio (already prefetched)
+        audio_path, audio_duration = audio
+        if audio_path:
+            if self.premix_audio:
+                self.narration.add(self.renderer.time, audio_path)
+            else:
+                self.add_sound(audio_path)
+
+        # 2. Text Updates
+        with self.tracer.span("text.build"):
+            new_code = make_text(code_text, font="Monospace", font_size=28, color=GREEN)
+            new_code.next_to(self.code_header, DOWN).align_to(self.code_header, LEFT)
+            new_subtitle = make_text(narration_text, font_size=24, color=WHITE).to_edge(DOWN, buff=1.0)
+
+        # Base animations (Text changes)
+        animations = [
+            Transform(self.current_code_line, new_code),
+            Transform(self.subtitle, new_subtitle)
+        ]
+
+        # ====================================================
+        # SCALABLE LOGIC BLOCK
+        # ====================================================
+
+        if action == Action.VAR_CREATE and self.visible_slots:
+            animations.extend(self.virtual_var_create(params))
+
+        elif action == Action.VAR_UPDATE:
+            with self.tracer.span("var.update", name=params["name"]):
+                animations.extend(self.var_update(params))
+
+        elif action == Action.VAR_CREATE:
+            # A. Detect Scope Change
+            target_scope = params.get("scope", DEFAULT_SCOPE)
+            idx = len(self.variables_on_screen)
+
+            # If stack doesn't exist OR name doesn't match current scope -> Create New Stack Frame
+            if not self.active_stack or self.active_stack.frame_name != target_scope:
+
+                # Create new stack visual
+                with self.tracer.span("stack.build", scope=target_scope):
+                    if total_vars is None:
+                        # Streaming: size the frame for what is needed now and grow it later
+                        self.active_stack = DynamicStack(target_scope, capacity=idx + 1, growable=True)
+                    else:
+                        self.active_stack = DynamicStack(target_scope, capacity=total_vars)
                     self.active_stack.generate_mobjects()
-                    
-                    # Add stack animation to the list (it will play with the text update)
-                    animations.extend(self.active_stack.get_animations())
-                    
-                    # Optional: If changing scope, maybe clear old variables? 
-                    # For now, we keep them to show history, but usually you'd hide them.
-                    # self.variables_on_screen = [] # Uncomment to clear vars on scope change
-
-                # B. Create Variable
-                idx = len(self.variables_on_screen)
-                target_pos = self.active_stack.get_slot_position(idx)
 
+                # Add stack animation to the list (it will play with the text update)
+                animations.extend(self.active_stack.get_animations())
+
+                # Optional: If changing scope, maybe clear old variables? 
+                # For now, we keep them to show history, but usually you'd hide them.
+                # self.variables_on_screen = [] # Uncomment to clear vars on scope change
+            else:
+                # Only growable stacks ever run out of slots
+                animations.extend(self.active_stack.ensure_capacity(idx + 1))
+
+            # B. Create Variable
+            target_pos = self.active_stack.get_slot_position(idx)
+
+            with self.tracer.span("var.build", name=params["name"]):
                 var_block = VarCreate(params["name"], params["value"], target_pos)
                 mobjects = var_block.generate_mobjects()
-                
-                self.variables_on_screen.append(mobjects)
-                animations.extend(var_block.get_animations())
 
-            # elif action_type == "FuncCreate":
-            #    pass  <-- Place holder for future logic
-            
-            # elif action_type == "Return":
-            #    pass  <-- Place holder for future logic
+            self.variables_on_screen.append(mobjects)
+            self.var_blocks.setdefault(target_scope, {})[params["name"]] = mobjects
+            animations.extend(var_block.get_animations())
+
+        # elif action == Action.FUNC_CREATE:
+        #    pass  <-- Place holder for future logic
+
+        # elif action == Action.RETURN:
+        #    pass  <-- Place holder for future logic
+
+        # ====================================================
 
-            # ====================================================
-            
-            # 3. Play All Animations Together
+        # 3. Play All Animations Together
+        with self.tracer.span("play", animations=len(animations)) as span:
             self.play(*animations, run_time=1.5)
+            span.set(frames=round(1.5 * config.frame_rate))
 
-            # 4. Wait
-            remaining_audio = audio_duration - 1.5
-            buffer_time = 0.1
-            if remaining_audio > 0:
-                self.wait(remaining_audio + buffer_time)
+        # 4. Wait
+        remaining_audio = audio_duration - 1.5
+        buffer_time = 0.1
+        wait_time = remaining_audio + buffer_time if remaining_audio > 0 else buffer_time
+        with self.tracer.span("wait", seconds=wait_time, frames=round(wait_time * config.frame_rate)) as span:
+            if self.hold_waits and wait_time >= HOLD_MIN_SECONDS:
+                span.set(hold=True)
+                self.hold(wait_time)
             else:
-                self.wait(buffer_time)
+                self.wait(wait_time)
+
+    def mix_narration(self, duration=0):
+        """Build the pre-mixed narration track and hand it to the file writer in one piece.
+
+        `duration` pads the track with silence, e.g. to give a clip without
+        narration an audio stream.
+        """
+        if not self.premix_audio or (not self.narration.clips and not duration):
+            return
+        with self.tracer.span("audio.mix", clips=len(self.narration.clips)):
+            track = self.narration.build(duration)
+            self.renderer.file_writer.add_audio_segment(track, time=0)
+
+    def hold(self, seconds):
+        """A static `wait(seconds)` that renders a single frame and lets ffmpeg repeat it.
+
+        The one-frame partial movie manim wrote is repeated for the whole
+        duration into a new clip, encoded with manim's own partial-movie
+        settings (see `ffmpeg.PARTIAL_MOVIE_VIDEO_ARGS`), which takes its place
+        in the file writer's list. The list stays one entry per play, as manim
+        indexes it by play number. The scene clock is advanced to match, so
+        later sounds and animations start exactly where they would after a
+        regular wait. Only valid while nothing on screen moves (no updaters).
+        """
+        frame = 1 / config.frame_rate
+        if not config.write_to_movie or seconds < 2 * frame:
+            self.wait(seconds)
+            return
+
+        self.wait(frame)
+        file_writer = self.renderer.file_writer
+        partial = file_writer.partial_movie_files[-1] if file_writer.partial_movie_files else None
+        if not partial or not os.path.exists(partial):
+            # Nothing was written for this wait (e.g. skipped animations): keep the timing right
+            self.wait(seconds - frame)
+            return
+
+        # Same frame count as wait(seconds) would have produced
+        n_frames = math.ceil(seconds * config.frame_rate)
+        base, ext = os.path.splitext(partial)
+        # A new file: manim may reuse the cached one-frame partial for an identical wait later
+        held = repeat_frame(partial, f"{base}_hold{self.renderer.num_plays}{ext}", n_frames, config.frame_rate)
+        file_writer.partial_movie_files[-1] = held
+        self.renderer.time += seconds - frame
+
+    def virtual_var_create(self, params):
+        """VarCreate with a bounded scene graph: only the active frame and its visible window are on screen.
+
+        On a scope change the previous frame is retired and the target frame is
+        drawn with its newest variables, so re-entering a scope shows what it
+        already holds.
+        """
+        target_scope = params.get("scope", DEFAULT_SCOPE)
+        scope_vars = self.scope_variables.setdefault(target_scope, [])
+        animations = []
+
+        if not self.active_stack or self.active_stack.frame_name != target_scope:
+            if self.active_stack:
+                animations.extend(self.active_stack.retire())
+            with self.tracer.span("stack.build", scope=target_scope):
+                self.active_stack = VirtualStack(target_scope, self.visible_slots)
+                # Redraw the frame as it looks after the push below: the new variable then lands
+                # in a free slot, and no block is faded in and scrolled out in the same play
+                keep = self.active_stack.visible_slots - 1
+                self.active_stack.generate_mobjects(scope_vars[max(len(scope_vars) - keep, 0):] if keep else [])
+            animations.extend(self.active_stack.get_animations())
+
+        value = str(params["value"])
+        with self.tracer.span("var.build", name=params["name"]):
+            animations.extend(self.active_stack.push(params["name"], value))
+        self.slot_index.setdefault(target_scope, {})[params["name"]] = len(scope_vars)
+        scope_vars.append((params["name"], value))
+        return animations
+
+    def is_defined(self, params):
+        """Whether the variable in `params` already has a slot in its frame."""
+        scope = params.get("scope", DEFAULT_SCOPE)
+        index = self.slot_index if self.visible_slots else self.var_blocks
+        return params["name"] in index.get(scope, ())
+
+    def var_update(self, params):
+        """Swap the value text of an existing variable in place: one text rebuild, no new mobjects.
+
+        A windowed variable that has scrolled out of view, or whose frame is
+        not the active one, is only updated as data and shows its new value
+        when it is drawn again.
+        """
+        scope = params.get("scope", DEFAULT_SCOPE)
+        name = params["name"]
+        value = str(params["value"])
+
+        if self.visible_slots:
+            self.scope_variables[scope][self.slot_index[scope][name]] = (name, value)
+            on_active_frame = self.active_stack and self.active_stack.frame_name == scope
+            block = self.active_stack.index.get(name) if on_active_frame else None
+        else:
+            block = self.var_blocks[scope][name]
+        if block is None:
+            return []
+
+        update = VarUpdate(block, value)
+        update.generate_mobjects()
+        return update.get_animations()
 
 # ==========================================
 # 4. WRAPPER
 # ==========================================
-def render_code_animation(json_input):
-    output_folder = "./output_video"
-    config.media_dir = output_folder
-    config.verbosity = "WARNING"
-    config.quality = "low_quality"
-    config.preview = False 
-    
-    scene = CodeAnimatorEngine(script_data=json_input)
-    scene.render()
-    
-    final_filename = "CodeAnimatorEngine.mp4"
-    found_video = None
-    for root, dirs, files in os.walk(output_folder):
-        if final_filename in files:
-            found_video = os.path.join(root, final_filename)
-            break
-            
-    target_video = "final_output.mp4"
-    final_path = os.path.abspath(target_video)
-
-    if found_video:
-        if os.path.exists(target_video): os.remove(target_video)
-        shutil.move(found_video, target_video)
+def render_code_animation(json_input, output_path="final_output.mp4", audio_cache_dir=DEFAULT_CACHE_DIR,
+                          tts_concurrency=4, segment_cache_dir=None, workers=1, trace_path=None,
+                          visible_slots=DEFAULT_VISIBLE_SLOTS, hold_waits=False, layout=None, renditions=None):
+    """Render the keyframe script to `output_path` and return its absolute path.
+
+    `output_path` may instead be a writable binary file object (an open file,
+    a pipe, a socket's makefile("wb")); the video is then written into it as
+    fragmented MP4 and the object is returned. Segmented renders stream their
+    final concatenation into it as ffmpeg produces it. A single-scene render
+    is combined and muxed by manim first, so the stream only receives a
+    stream-copy remux of the finished movie: nothing is sent before encoding
+    is done. A file output only appears once it is complete.
+    ``layout`` picks the MP4 layout of a file output: None (as encoded),
+    "faststart" (index up front, for progressive download) or "fragmented"
+    (playable while still being written).
+
+    ``json_input`` is a script dict, a JSON or NDJSON string, or an iterator of
+    steps (dicts or NDJSON lines, e.g. an open file or a generator). Iterators
+    are played as they are consumed, so rendering starts with the first step;
+    segmented renders collect the whole stream first. A complete script is
+    validated before anything else happens and raises `plan.PlanError` listing
+    every bad step; it may also be a compiled `plan.Plan` or its saved
+    ``to_dict()``. Streamed steps are validated as they arrive.
+
+    Every render works in its own temporary workspace (media dir and voiceover
+    files) under a scoped manim config, so several renders can run side by side
+    in separate processes without touching each other's files. manim's config
+    and the text cache are shared by the whole process, so renders started on
+    several threads are serialized instead and run one at a time. The workspace
+    is created next to a file output, so the finished video is moved into
+    place with a rename.
+
+    Narration audio is cached in ``audio_cache_dir`` across renders; pass None
+    to synthesize every step from scratch. Up to ``tts_concurrency`` narrations
+    are synthesized in parallel before the scene starts playing.
+
+    With ``segment_cache_dir`` set, each step is rendered as its own segment and
+    cached there, so re-renders only redo the steps whose inputs changed; the
+    least recently used segments are pruned once the directory grows past
+    `segments.DEFAULT_SEGMENT_CACHE_MAX_BYTES`.
+    With ``workers`` other than 1 the sequence is split at step boundaries and
+    the segments are rendered in a process pool (None = one worker per core).
+    Segments are concatenated directly into the output.
+
+    With ``visible_slots`` set (e.g. 4) each stack frame shows at most that
+    many variables and only the active frame is on screen, which keeps the
+    scene graph (and per-frame cost) bounded for long scripts. None, the
+    default, keeps every frame and variable on screen.
+
+    With ``hold_waits`` the static narration waits are rendered as one frame
+    and extended by ffmpeg, so a wait costs about the same however long it is;
+    the video looks the same.
+
+    ``renditions`` (e.g. ["1080p", "720p", "480p"], see `renditions.LADDER`)
+    renders the scene once at the largest of them and encodes all of them from
+    that master in one ffmpeg pass, as ``<stem>_<name><ext>`` next to
+    `output_path`; a dict of name -> path is returned instead.
+
+    With ``trace_path`` set, per-phase and per-step spans are written there as
+    Chrome trace-event JSON and a summary table is logged. Segmented renders
+    are traced as a whole, since segments render in other processes.
+    """
+    tracer = Tracer() if trace_path else NULL_TRACER
+    if not is_stream(json_input) or isinstance(json_input, Plan):
+        # Reject a malformed script before any workspace, TTS or rendering exists
+        json_input = compile_plan(json_input)
+    audio_cache = AudioCache(audio_cache_dir) if audio_cache_dir else None
+    to_file = isinstance(output_path, (str, os.PathLike))
+    ladder = resolve_renditions(renditions) if renditions else None
+    if ladder and not to_file:
+        raise ValueError("renditions are written as files next to output_path; a stream can't hold them")
+    if to_file:
+        output = os.path.abspath(output_path)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=".render_", dir=os.path.dirname(output))
     else:
-        return None
+        output = output_path
+        work_dir = tempfile.mkdtemp(prefix="render_")
 
-    if os.path.exists(output_folder): shutil.rmtree(output_folder)
-    for f in glob.glob("voiceover_*.mp3"): 
-        try: os.remove(f)
-        except: pass
-        
-    return final_path
\ No newline at end of file
+    try:
+        with tracer.span("render"):
+            with _RENDER_LOCK, tempconfig({}):
+                config.media_dir = os.path.join(work_dir, "output_video")
+                config.verbosity = "WARNING"
+                config.quality = "low_quality"
+                config.preview = False 
+                if ladder:
+                    # Rasterize once, at the top of the ladder
+                    config.pixel_width, config.pixel_height = ladder[0].width, ladder[0].height
+                    config.frame_rate = LADDER_FRAME_RATE
+
+                if segment_cache_dir or workers != 1:
+                    from .segments import render_segmented
+                    target = os.path.join(work_dir, "master.mp4") if ladder else output
+                    with tracer.span("render_segmented", workers=workers):
+                        rendered = render_segmented(json_input, target, segment_cache_dir,
+                                                    audio_cache, tts_concurrency, workers=workers, audio_dir=work_dir,
+                                                    visible_slots=visible_slots, hold_waits=hold_waits,
+                                                    layout=None if ladder else layout)
+                    movie_path = target if ladder else None
+                else:
+                    scene = CodeAnimatorEngine(script_data=json_input, audio_cache=audio_cache,
+                                               tts_concurrency=tts_concurrency, audio_dir=work_dir, tracer=tracer,
+                                               visible_slots=visible_slots, hold_waits=hold_waits)
+                    with tracer.span("scene.render") as span:
+                        scene.render()
+                        span.set(frames=round(scene.renderer.time * config.frame_rate))
+                        # Combining the partial movies and muxing the audio
+                        tracer.record("encode", scene.construct_finished, time.perf_counter())
+                    movie_path = scene.renderer.file_writer.movie_file_path
+                    rendered = movie_path and os.path.exists(movie_path)
+
+            if audio_cache is not None:
+                logger.info(f"TTS audio cache: {audio_cache.stats()}")
+            logger.info(f"Text cache: {TEXT_CACHE.stats()}")
+
+            if not rendered:
+                return None
+            if ladder:
+                targets = rendition_paths(output, ladder)
+                with tracer.span("renditions", renditions=len(ladder)):
+                    encode_renditions(str(movie_path), [(targets[r.name], r.width, r.height, r.bitrate) for r in ladder],
+                                      layout)
+                return targets
+            if movie_path is not None:
+                with tracer.span("deliver", layout=layout, stream=not to_file):
+                    if to_file and layout is None:
+                        # Same filesystem as the workspace: a rename, not a copy
+                        os.replace(movie_path, output)
+                    else:
+                        remux(str(movie_path), output, layout)
+    finally:
+        with tracer.span("cleanup"):
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if trace_path:
+            tracer.export_chrome(trace_path)
+            logger.info(f"Render trace written to {trace_path}\n{tracer.format_summary()}")
+
+    return output
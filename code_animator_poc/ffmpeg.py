@@ -0,0 +1,179 @@
+"""Thin helpers around the ffmpeg command line used for post-processing renders."""
+import os
+import subprocess
+import tempfile
+
+FFMPEG = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg quietly with `args`, raising RuntimeError with its stderr on failure."""
+    cmd = [FFMPEG, "-hide_banner", "-loglevel", "error", "-y", *args]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {proc.stderr.decode(errors='replace').strip()}")
+    return proc
+
+
+def _partial_path(output_path):
+    """Temp path next to `output_path` that ffmpeg writes to before it is renamed into place."""
+    directory, name = os.path.split(os.path.abspath(output_path))
+    stem, ext = os.path.splitext(name)
+    # Keep the extension: ffmpeg picks the container from it
+    return os.path.join(directory, f".{stem}.{os.getpid()}.partial{ext}")
+
+
+def _run_ffmpeg_to_paths(args, outputs):
+    """Run ffmpeg with `args`, where each output is given as ``(output_args, output_path)``.
+
+    Every output is written to a temp file next to its destination, and all of
+    them are renamed into place only once ffmpeg succeeds, so a failed or
+    interrupted run never leaves a truncated file at an output path.
+    """
+    outputs = [(output_args, os.fsdecode(output_path)) for output_args, output_path in outputs]
+    tmps = [_partial_path(output_path) for _, output_path in outputs]
+    try:
+        run_ffmpeg([*args, *(arg for (output_args, _), tmp in zip(outputs, tmps) for arg in (*output_args, tmp))])
+        for (_, output_path), tmp in zip(outputs, tmps):
+            os.replace(tmp, output_path)
+    finally:
+        for tmp in tmps:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return [output_path for _, output_path in outputs]
+
+
+def _run_ffmpeg_to_path(args, output_path):
+    """Run ffmpeg with `args` writing a temp file next to `output_path`, renamed into place only on success."""
+    return _run_ffmpeg_to_paths(args, [([], output_path)])[0]
+
+
+def concat_copy(paths, output_path, audio_codec="copy", layout=None):
+    """Concatenate media files with identical stream layouts without re-encoding video.
+
+    Audio is stream-copied too unless `audio_codec` is given; re-encoding it
+    lets the concat demuxer lay every clip's audio at its exact start time
+    instead of accumulating per-clip encoder padding.
+
+    `output_path` may also be a writable binary file object, which receives
+    the fragmented MP4 as ffmpeg produces it, and `layout` selects the MP4
+    layout as in `remux`. A file output is written next to its destination
+    and renamed into place once complete.
+    """
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="concat_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                fh.write(f"file '{escaped}'\n")
+        args = ["-f", "concat", "-safe", "0", "-i", list_path, "-c:v", "copy", "-c:a", audio_codec]
+        if isinstance(output_path, (str, bytes, os.PathLike)):
+            _run_ffmpeg_to_path([*args, *_movflags(layout)], output_path)
+        else:
+            run_ffmpeg_to_stream([*args, *_movflags("fragmented"), "-f", "mp4"], output_path)
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+# How manim encodes its partial movies (x264 defaults otherwise). manim joins the partials by
+# stream copy, which keeps the first one's SPS/PPS, so a clip slipped in among them must be
+# encoded with exactly these options or it decodes with the wrong parameters.
+PARTIAL_MOVIE_VIDEO_ARGS = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23", "-preset", "medium"]
+
+
+def repeat_frame(path, output_path, n_frames, frame_rate):
+    """Write `n_frames` copies of the one frame in `path` as a video-only clip, encoded like manim's partials.
+
+    The copies are clones of one picture, which x264 encodes as near-empty
+    skip frames, so the cost barely depends on `n_frames`.
+    """
+    run_ffmpeg([
+        "-i", path,
+        "-vf", f"loop=loop={n_frames - 1}:size=1:start=0,setpts=N/({frame_rate}*TB)",
+        "-r", str(frame_rate), "-frames:v", str(n_frames),
+        "-an", *PARTIAL_MOVIE_VIDEO_ARGS,
+        output_path,
+    ])
+    return output_path
+
+
+# -movflags for each MP4 layout: faststart puts the index up front (progressive download);
+# fragmented writes self-contained fragments, so the file is playable while it is still being written
+MP4_MOVFLAGS = {
+    "faststart": "+faststart",
+    "fragmented": "+frag_keyframe+empty_moov+default_base_moof",
+}
+
+
+def _movflags(layout):
+    if layout is None:
+        return []
+    if layout not in MP4_MOVFLAGS:
+        raise ValueError(f"unknown MP4 layout {layout!r}; expected one of {sorted(MP4_MOVFLAGS)}")
+    return ["-movflags", MP4_MOVFLAGS[layout]]
+
+
+def run_ffmpeg_to_stream(args, stream, chunk_size=1 << 16):
+    """Run ffmpeg with its output on stdout, copying it to the binary file object `stream` as it is produced."""
+    cmd = [FFMPEG, "-hide_banner", "-loglevel", "error", "-y", *args, "pipe:1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with proc:
+        for chunk in iter(lambda: proc.stdout.read(chunk_size), b""):
+            stream.write(chunk)
+        # -loglevel error keeps stderr small enough not to block ffmpeg while stdout is drained
+        stderr = proc.stderr.read()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {stderr.decode(errors='replace').strip()}")
+    if hasattr(stream, "flush"):
+        stream.flush()
+
+
+def remux(path, output, layout=None):
+    """Stream-copy `path` into `output`, a file path or a writable binary file object.
+
+    `layout` is None (as encoded), "faststart" or "fragmented". Writing to a
+    file object always produces fragmented MP4, the only layout that needs
+    no seeking. A file output appears only once it is complete.
+    """
+    if isinstance(output, (str, bytes, os.PathLike)):
+        _run_ffmpeg_to_path(["-i", path, "-map", "0", "-c", "copy", *_movflags(layout)], output)
+    else:
+        run_ffmpeg_to_stream(["-i", path, "-map", "0", "-c", "copy", *_movflags("fragmented"), "-f", "mp4"], output)
+    return output
+
+
+def parse_kbps(bitrate):
+    """A bitrate in kbps from an int (kbps) or an ffmpeg-style string: "2800k", "2.5M", "2500000"."""
+    if isinstance(bitrate, (int, float)):
+        return int(bitrate)
+    text = bitrate.strip()
+    scale = {"k": 1, "m": 1000}.get(text[-1:].lower())
+    try:
+        return int(float(text[:-1]) * scale) if scale else int(float(text) / 1000)
+    except ValueError:
+        raise ValueError(f"invalid bitrate {bitrate!r}; expected kbps or a string like '2800k' or '2.5M'") from None
+
+
+def encode_renditions(path, outputs, layout=None):
+    """Decode `path` once and encode several scaled copies of it in the same ffmpeg run.
+
+    `outputs` is a list of (output_path, width, height, video_bitrate) with
+    bitrates in kbps or ffmpeg notation ("2800k", "2.5M"). Audio is
+    stream-copied into every output. The outputs appear only once all of them
+    are complete.
+    """
+    n = len(outputs)
+    graph = [f"[0:v]split={n}" + "".join(f"[s{i}]" for i in range(n))]
+    graph += [f"[s{i}]scale={w}:{h}:flags=lanczos[v{i}]" for i, (_, w, h, _) in enumerate(outputs)]
+    args = ["-i", path, "-filter_complex", ";".join(graph)]
+    targets = []
+    for i, (output_path, _, _, bitrate) in enumerate(outputs):
+        rate = parse_kbps(bitrate)
+        targets.append(([
+            "-map", f"[v{i}]", "-map", "0:a?",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p",
+            "-b:v", f"{rate}k", "-maxrate", f"{rate}k", "-bufsize", f"{rate * 2}k",
+            "-c:a", "copy", *_movflags(layout),
+        ], output_path))
+    return _run_ffmpeg_to_paths(args, targets)
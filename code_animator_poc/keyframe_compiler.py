@@ -0,0 +1,274 @@
+"""Local, deterministic AST -> keyframes compiler.
+
+Walks the compact AST produced by `ast_service.parse_code` and emits the
+`{"sequence": [...]}` script consumed by `CodeAnimatorEngine`, with template
+narration. Statements are visited in source order; function bodies are
+narrated where they are defined, inside the function's own scope.
+
+Step types emitted:
+- VarCreate  first assignment to a name in a scope (params: name, value, type, scope)
+- VarUpdate  reassignment of a name already defined in that scope (same params)
+- FuncCreate function definition (params: name, args, scope)
+- Return     return statement (params: value, scope)
+- If / Else  condition check and else branch (params: test)
+- Loop       for/while header (params: kind, target/iter or test)
+- Call       call statement such as print(...) (params: func, args)
+- Statement  anything else (params: node)
+
+Usage:
+    python -m code_animator_poc.keyframe_compiler ast_service/code_snippets/*.py -o keyframes/
+"""
+import argparse
+import json
+import os
+import sys
+
+GLOBAL_SCOPE = "Global Frame"
+
+_BIN_OPS = {
+    "Add": "+", "Sub": "-", "Mult": "*", "Div": "/", "FloorDiv": "//", "Mod": "%",
+    "Pow": "**", "MatMult": "@", "LShift": "<<", "RShift": ">>", "BitAnd": "&",
+    "BitOr": "|", "BitXor": "^",
+}
+_CMP_OPS = {
+    "Eq": "==", "NotEq": "!=", "Lt": "<", "LtE": "<=", "Gt": ">", "GtE": ">=",
+    "Is": "is", "IsNot": "is not", "In": "in", "NotIn": "not in",
+}
+_UNARY_OPS = {"Not": "not ", "USub": "-", "UAdd": "+", "Invert": "~"}
+_BOOL_OPS = {"And": "and", "Or": "or"}
+
+
+def _op_name(op):
+    # BinOp keeps the op as a string, the generic fallback as {"type": ...}
+    return op["type"] if isinstance(op, dict) else op
+
+
+def expr_to_source(node):
+    """Render a compact expression back to (approximate) Python source."""
+    if not isinstance(node, dict):
+        return repr(node)
+    t = node.get("type")
+    if t == "Name":
+        return node["name"]
+    if t == "BinOp":
+        op = _BIN_OPS.get(_op_name(node["op"]), "?")
+        return f"{expr_to_source(node['left'])} {op} {expr_to_source(node['right'])}"
+    if t == "Compare":
+        parts = [expr_to_source(node["left"])]
+        for op, comp in zip(node["ops"], node["comparators"]):
+            parts += [_CMP_OPS.get(op, "?"), expr_to_source(comp)]
+        return " ".join(parts)
+    if t == "BoolOp":
+        op = f" {_BOOL_OPS.get(_op_name(node['op']), '?')} "
+        return op.join(expr_to_source(v) for v in node.get("values", []))
+    if t == "UnaryOp":
+        return f"{_UNARY_OPS.get(_op_name(node['op']), '?')}{expr_to_source(node['operand'])}"
+    if t == "Call":
+        args = ", ".join(expr_to_source(a) for a in node.get("args", []))
+        return f"{expr_to_source(node['func'])}({args})"
+    if t == "Attribute":
+        return f"{expr_to_source(node['value'])}.{node['attr']}"
+    if t == "Subscript":
+        return f"{expr_to_source(node['value'])}[{expr_to_source(node.get('slice'))}]"
+    if t in ("List", "Tuple", "Set"):
+        inner = ", ".join(expr_to_source(e) for e in node.get("elts", []))
+        if t == "List":
+            return f"[{inner}]"
+        if t == "Set":
+            return f"{{{inner}}}"
+        return f"({inner}{',' if len(node.get('elts', [])) == 1 else ''})"
+    if t == "Dict":
+        items = ", ".join(
+            f"{expr_to_source(k)}: {expr_to_source(v)}" if k is not None else f"**{expr_to_source(v)}"
+            for k, v in zip(node.get("keys", []), node.get("values", []))
+        )
+        return f"{{{items}}}"
+    return "..."
+
+
+class KeyframeCompiler:
+    """Compiles one module; instances are single-use."""
+
+    def __init__(self, source=None):
+        self.lines = source.splitlines() if source is not None else None
+        self.steps = []
+        # Names defined so far, per scope
+        self.defined = {}
+
+    def _code(self, node, fallback):
+        lineno = node.get("lineno")
+        if self.lines is not None and lineno and 0 < lineno <= len(self.lines):
+            return self.lines[lineno - 1].strip()
+        return fallback
+
+    def _emit(self, step_type, code, narration, **params):
+        self.steps.append({"type": step_type, "code": code, "narration": narration, "params": params})
+
+    def compile(self, ast_obj):
+        self._block(ast_obj.get("body", []), GLOBAL_SCOPE)
+        return {"sequence": self.steps}
+
+    def _block(self, statements, scope):
+        for stmt in statements:
+            # bare constants (docstrings) and other non-node statements carry no step
+            if isinstance(stmt, dict):
+                self._statement(stmt, scope)
+
+    def _statement(self, node, scope):
+        t = node.get("type")
+        handler = getattr(self, f"_s_{t}", None)
+        if handler is not None:
+            handler(node, scope)
+        else:
+            code = self._code(node, t)
+            self._emit("Statement", code, f"Next, the program runs: {code}.", node=t, scope=scope)
+
+    # --- statements -------------------------------------------------------
+
+    def _assign_name(self, node, name, value, scope, code):
+        if isinstance(value, dict):
+            value_text = expr_to_source(value)
+            value_type = "expr"
+        else:
+            value_text = value
+            value_type = type(value).__name__
+        known = self.defined.setdefault(scope, set())
+        step_type = "VarUpdate" if name in known else "VarCreate"
+        if name in known:
+            narration = f"We update {name} to {expr_to_source(value)}."
+        elif value_type == "expr":
+            narration = f"We compute {value_text} and store the result in {name}."
+        else:
+            narration = f"We create the variable {name} and set it to {expr_to_source(value)}."
+        known.add(name)
+        self._emit(step_type, code, narration, name=name, value=value_text, type=value_type, scope=scope)
+
+    def _s_Assign(self, node, scope):
+        value = node.get("value")
+        names = [t["name"] for t in node.get("targets", []) if isinstance(t, dict) and t.get("type") == "Name"]
+        if not names:
+            code = self._code(node, f"... = {expr_to_source(value)}")
+            self._emit("Statement", code, f"We store {expr_to_source(value)}.", node="Assign", scope=scope)
+            return
+        for name in names:
+            self._assign_name(node, name, value, scope, self._code(node, f"{name} = {expr_to_source(value)}"))
+
+    def _s_AugAssign(self, node, scope):
+        target = node.get("target", {})
+        op = _BIN_OPS.get(_op_name(node.get("op")), "?")
+        if target.get("type") != "Name":
+            code = self._code(node, f"... {op}= {expr_to_source(node.get('value'))}")
+            self._emit("Statement", code, "We update a value in place.", node="AugAssign", scope=scope)
+            return
+        name = target["name"]
+        value = {"type": "BinOp", "op": _op_name(node.get("op")), "left": target, "right": node.get("value")}
+        self._assign_name(node, name, value, scope, self._code(node, f"{name} {op}= {expr_to_source(node.get('value'))}"))
+
+    def _s_FunctionDef(self, node, scope):
+        name = node["name"]
+        args = node.get("args", [])
+        code = self._code(node, f"def {name}({', '.join(args)}):")
+        if args:
+            narration = f"We define a function {name} that takes {', '.join(args)}."
+        else:
+            narration = f"We define a function {name} with no parameters."
+        self._emit("FuncCreate", code, narration, name=name, args=args, scope=scope)
+        self._block(node.get("body", []), f"{name}()")
+
+    def _s_Return(self, node, scope):
+        value = node.get("value")
+        value_text = expr_to_source(value) if value is not None else "None"
+        code = self._code(node, f"return {value_text}")
+        self._emit("Return", code, f"The function returns {value_text}.", value=value_text, scope=scope)
+
+    def _s_If(self, node, scope, keyword="if"):
+        test = expr_to_source(node.get("test"))
+        code = self._code(node, f"{keyword} {test}:")
+        self._emit("If", code, f"We check whether {test}.", test=test, scope=scope)
+        self._block(node.get("body", []), scope)
+
+        orelse = node.get("orelse", [])
+        if not orelse:
+            return
+        first = orelse[0]
+        # `elif` shows up as an else branch holding a single If on an `elif` line
+        if (len(orelse) == 1 and isinstance(first, dict) and first.get("type") == "If"
+                and self._code(first, "").startswith("elif")):
+            self._s_If(first, scope, keyword="elif")
+            return
+        self._emit("Else", "else:", f"Otherwise, when {test} is false, we run the else branch.", test=test, scope=scope)
+        self._block(orelse, scope)
+
+    def _s_For(self, node, scope):
+        target = expr_to_source(node.get("target"))
+        iterable = expr_to_source(node.get("iter"))
+        code = self._code(node, f"for {target} in {iterable}:")
+        self._emit("Loop", code, f"We loop over {iterable}, calling each item {target}.",
+                   kind="for", target=target, iter=iterable, scope=scope)
+        self._block(node.get("body", []), scope)
+        self._block(node.get("orelse", []), scope)
+
+    def _s_While(self, node, scope):
+        test = expr_to_source(node.get("test"))
+        code = self._code(node, f"while {test}:")
+        self._emit("Loop", code, f"While {test}, we keep repeating the loop body.", kind="while", test=test, scope=scope)
+        self._block(node.get("body", []), scope)
+        self._block(node.get("orelse", []), scope)
+
+    def _s_Call(self, node, scope):
+        func = expr_to_source(node.get("func"))
+        args = [expr_to_source(a) for a in node.get("args", [])]
+        code = self._code(node, f"{func}({', '.join(args)})")
+        if func == "print":
+            narration = f"We print {', '.join(args)}." if args else "We print an empty line."
+        elif args:
+            narration = f"We call {func} with {', '.join(args)}."
+        else:
+            narration = f"We call {func}."
+        self._emit("Call", code, narration, func=func, args=args, scope=scope)
+
+
+def compile_keyframes(ast_obj, source=None):
+    """Compile a compact module AST into a keyframe script.
+
+    `source` is used for the on-screen code lines; without it they are
+    rebuilt from the AST.
+    """
+    return KeyframeCompiler(source).compile(ast_obj)
+
+
+def compile_source(source, language="python"):
+    from ast_service import parse_code
+    return compile_keyframes(parse_code(source, language), source)
+
+
+def compile_files(paths, language="python"):
+    """Compile several source files; returns a dict of path -> keyframe script."""
+    results = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as fh:
+            results[path] = compile_source(fh.read(), language)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile source files into keyframe JSON scripts")
+    parser.add_argument("inputs", nargs="+", help="Source files to compile")
+    parser.add_argument("--output-dir", "-o", help="Write <name>.json per input here (default: print to stdout)")
+    parser.add_argument("--language", "-l", default="python")
+    args = parser.parse_args(argv)
+
+    scripts = compile_files(args.inputs, args.language)
+    if not args.output_dir:
+        json.dump(scripts if len(scripts) > 1 else next(iter(scripts.values())), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+    for path, script in scripts.items():
+        stem = os.path.splitext(os.path.basename(path))[0]
+        with open(os.path.join(args.output_dir, f"{stem}.json"), "w", encoding="utf-8") as fh:
+            json.dump(script, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
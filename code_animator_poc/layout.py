@@ -0,0 +1,175 @@
+"""Lightweight, manim-free model of the CodeAnimatorEngine layout.
+
+`LayoutState` captures everything on screen between two steps: the code line,
+the subtitle, the stack frames drawn so far and the variables in their slots.
+Applying a step to a state mirrors what `CodeAnimatorEngine` does to its
+mobjects, so the state at any step boundary can be replayed from the script
+alone without building or rendering anything.
+"""
+import json
+
+DEFAULT_SCOPE = "Global Frame"
+# Variables shown per stack frame, older ones scrolling out of view (e.g. 4 keeps the scene graph
+# bounded on long scripts). None, the default, shows every variable as the engine always has.
+DEFAULT_VISIBLE_SLOTS = None
+
+
+def is_stream(script_data):
+    """True for scripts that arrive incrementally (iterators, file objects) rather than as a whole."""
+    return not isinstance(script_data, (str, bytes, dict))
+
+
+def _steps_of(data):
+    # A whole document carries a "sequence"; an NDJSON line is a single step
+    if "sequence" in data:
+        return data["sequence"]
+    return [data]
+
+
+def _decode_lines(lines):
+    for line in lines:
+        if isinstance(line, (str, bytes)):
+            if not line.strip():
+                continue
+            line = json.loads(line)
+        yield from _steps_of(line)
+
+
+def iter_steps(script_data):
+    """Yield the steps of a script one at a time, as soon as each one is available.
+
+    Accepts a script dict, a JSON document string, an NDJSON string (one step
+    per line), or any iterable of step dicts or NDJSON lines, such as an open
+    file or a generator fed by a streaming producer.
+    """
+    if isinstance(script_data, dict):
+        yield from script_data.get("sequence", [])
+    elif isinstance(script_data, (str, bytes)):
+        try:
+            data = json.loads(script_data)
+        except json.JSONDecodeError:
+            yield from _decode_lines(script_data.splitlines())
+        else:
+            yield from _steps_of(data)
+    else:
+        yield from _decode_lines(script_data)
+
+
+def load_script(script_data):
+    """Return the script as a dict, decoding and collecting it first if needed."""
+    if isinstance(script_data, dict):
+        return script_data
+    if isinstance(script_data, str):
+        try:
+            data = json.loads(script_data)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict) and "sequence" in data:
+            return data
+    return {"sequence": list(iter_steps(script_data))}
+
+
+def count_var_creates(sequence):
+    """Number of steps that add a variable slot, used to size every stack frame.
+
+    That is every VarCreate, plus any VarUpdate of a name its scope hasn't
+    defined yet (drawn as a new variable).
+    """
+    defined = set()
+    count = 0
+    for step in sequence:
+        step_type = step.get("type")
+        if step_type not in ("VarCreate", "VarUpdate"):
+            continue
+        params = step.get("params", {})
+        key = (params.get("scope", DEFAULT_SCOPE), params.get("name"))
+        if step_type == "VarCreate" or key not in defined:
+            count += 1
+        defined.add(key)
+    return count
+
+
+class LayoutState:
+    def __init__(self, code=None, subtitle="", stacks=None, variables=None, variable_scopes=None):
+        # None means the initial "Initializing..." placeholder is still showing
+        self.code = code
+        self.subtitle = subtitle
+        # Frame names in creation order; without a visible-slot window every frame stays on screen
+        self.stacks = list(stacks or [])
+        # (name, value) pairs; the list index is the slot index
+        self.variables = [tuple(v) for v in (variables or [])]
+        # Scope each variable was created in, parallel to `variables`
+        if variable_scopes is None:
+            variable_scopes = [self.active_stack] * len(self.variables)
+        self.variable_scopes = list(variable_scopes)
+        # Per frame: name -> index into `variables` of its newest slot
+        self.slot_index = {}
+        for idx, ((name, _), scope) in enumerate(zip(self.variables, self.variable_scopes)):
+            self.slot_index.setdefault(scope, {})[name] = idx
+
+    @property
+    def active_stack(self):
+        return self.stacks[-1] if self.stacks else None
+
+    def apply(self, step):
+        """Advance the state past `step`, exactly as the engine's step loop does."""
+        self.code = step.get("code", "")
+        self.subtitle = step.get("narration", "")
+
+        step_type = step.get("type", "")
+        if step_type not in ("VarCreate", "VarUpdate"):
+            return self
+        params = step.get("params", {})
+        scope = params.get("scope", DEFAULT_SCOPE)
+        name = params["name"]
+        value = str(params["value"])
+
+        frame_index = self.slot_index.setdefault(scope, {})
+        if step_type == "VarUpdate" and name in frame_index:
+            # Only the value changes; the variable keeps its slot
+            self.variables[frame_index[name]] = (name, value)
+            return self
+
+        if self.active_stack != scope:
+            self.stacks.append(scope)
+        frame_index[name] = len(self.variables)
+        self.variables.append((name, value))
+        self.variable_scopes.append(scope)
+        return self
+
+    def scope_variables(self, scope):
+        """(name, value) pairs created in `scope`, oldest first."""
+        return [v for v, s in zip(self.variables, self.variable_scopes) if s == scope]
+
+    def visible_variables(self, visible_slots):
+        """The active frame's variables inside a `visible_slots` window; the list index is the slot index."""
+        if self.active_stack is None:
+            return []
+        return self.scope_variables(self.active_stack)[-visible_slots:]
+
+    def copy(self):
+        return LayoutState(self.code, self.subtitle, self.stacks, self.variables, self.variable_scopes)
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "subtitle": self.subtitle,
+            "stacks": list(self.stacks),
+            "variables": [list(v) for v in self.variables],
+            "variable_scopes": list(self.variable_scopes),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get("code"), d.get("subtitle", ""), d.get("stacks"), d.get("variables"), d.get("variable_scopes"))
+
+
+def replay_states(sequence, state=None):
+    """Yield the layout state *before* each step of `sequence`.
+
+    Each yielded state is an independent copy and safe to keep.
+    """
+    state = state.copy() if state is not None else LayoutState()
+    for step in sequence:
+        yield state.copy()
+        state.apply(step)
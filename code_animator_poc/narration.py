@@ -0,0 +1,63 @@
+"""One pre-mixed narration track for a whole scene.
+
+Instead of handing every step's clip to manim with `add_sound` (which mixes
+each one into the scene's audio as it goes), the engine records where each
+clip starts and builds the full track once at the end: clips and the silence
+between them are decoded to the same raw PCM layout and joined in a single
+pass, then muxed with the video.
+"""
+from pydub import AudioSegment
+
+# gTTS produces 24 kHz mono audio
+NARRATION_FRAME_RATE = 24000
+
+
+class NarrationTrack:
+    def __init__(self, frame_rate=NARRATION_FRAME_RATE, channels=1, sample_width=2):
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        # (start seconds, path or AudioSegment)
+        self.clips = []
+
+    def add(self, start, clip):
+        """Place `clip` (a file path or AudioSegment) at `start` seconds."""
+        self.clips.append((start, clip))
+
+    def _load(self, clip):
+        segment = AudioSegment.from_file(clip) if isinstance(clip, str) else clip
+        return (segment.set_frame_rate(self.frame_rate)
+                       .set_channels(self.channels)
+                       .set_sample_width(self.sample_width))
+
+    def _silence(self, n_frames):
+        return b"\0" * (n_frames * self.channels * self.sample_width)
+
+    def build(self, duration=0):
+        """Return the mixed track, padded with silence to at least `duration` seconds.
+
+        Clips that do not overlap (the normal case: a step lasts at least as
+        long as its narration) are joined without any mixing; an overlapping
+        clip is overlaid on what came before it.
+        """
+        frame_bytes = self.channels * self.sample_width
+        chunks = []
+        overlaps = []
+        end = 0  # in frames
+        for start, clip in sorted(self.clips, key=lambda c: c[0]):
+            segment = self._load(clip)
+            start_frame = round(start * self.frame_rate)
+            if start_frame < end:
+                overlaps.append((start, segment))
+                continue
+            chunks.append(self._silence(start_frame - end))
+            chunks.append(segment.raw_data)
+            end = start_frame + len(segment.raw_data) // frame_bytes
+
+        total = max(end, round(duration * self.frame_rate))
+        chunks.append(self._silence(total - end))
+        track = AudioSegment(data=b"".join(chunks), sample_width=self.sample_width,
+                             frame_rate=self.frame_rate, channels=self.channels)
+        for start, segment in overlaps:
+            track = track.overlay(segment, position=start * 1000)
+        return track
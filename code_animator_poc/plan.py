@@ -0,0 +1,194 @@
+"""Keyframe validation and the compiled step plan.
+
+`compile_plan` checks a whole script before anything expensive runs and
+turns its `sequence` into a `Plan`: a tuple of compact `PlanStep` records
+whose action is an `Action` enum instead of a string. Every problem is
+collected and raised together in one `PlanError`, each tagged with its step
+index, so a bad script fails in milliseconds rather than after its earlier
+steps have been synthesized and rendered.
+
+A plan serializes to plain JSON (`Plan.to_dict`) and loads back without
+being validated again, so it can be compiled once and reused across renders:
+
+    python -m code_animator_poc.plan script.json -o script.plan.json
+"""
+import argparse
+import json
+import sys
+from enum import IntEnum
+from typing import NamedTuple
+
+from .layout import DEFAULT_SCOPE, count_var_creates, load_script
+
+PLAN_VERSION = 1
+
+
+class Action(IntEnum):
+    # Any step type the engine doesn't draw anything for beyond the code line and subtitle
+    OTHER = 0
+    VAR_CREATE = 1
+    VAR_UPDATE = 2
+    FUNC_CREATE = 3
+    RETURN = 4
+    IF = 5
+    ELSE = 6
+    LOOP = 7
+    CALL = 8
+    STATEMENT = 9
+
+
+ACTIONS = {
+    "VarCreate": Action.VAR_CREATE,
+    "VarUpdate": Action.VAR_UPDATE,
+    "FuncCreate": Action.FUNC_CREATE,
+    "Return": Action.RETURN,
+    "If": Action.IF,
+    "Else": Action.ELSE,
+    "Loop": Action.LOOP,
+    "Call": Action.CALL,
+    "Statement": Action.STATEMENT,
+}
+VAR_ACTIONS = (Action.VAR_CREATE, Action.VAR_UPDATE)
+
+
+class PlanStep(NamedTuple):
+    action: Action
+    type: str
+    code: str
+    narration: str
+    params: dict
+
+    def as_dict(self):
+        """The step in keyframe JSON form, plus its numeric action."""
+        return {"action": int(self.action), "type": self.type, "code": self.code,
+                "narration": self.narration, "params": self.params}
+
+
+class PlanError(ValueError):
+    """A script failed validation; `errors` lists every (step index, message), index None for the script itself."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        lines = [f"{'script' if i is None else f'step {i}'}: {message}" for i, message in errors]
+        super().__init__(f"{len(errors)} keyframe error(s):\n" + "\n".join(lines))
+
+
+def _check_step(step, errors, index):
+    if not isinstance(step, dict):
+        errors.append((index, f"expected an object, got {type(step).__name__}"))
+        return None
+    step_type = step.get("type")
+    if not isinstance(step_type, str) or not step_type:
+        errors.append((index, "missing or non-string 'type'"))
+        return None
+    for field in ("code", "narration"):
+        if not isinstance(step.get(field, ""), str):
+            errors.append((index, f"'{field}' must be a string"))
+    params = step.get("params", {})
+    if not isinstance(params, dict):
+        errors.append((index, "'params' must be an object"))
+        return None
+
+    action = ACTIONS.get(step_type, Action.OTHER)
+    if action in VAR_ACTIONS:
+        params = dict(params)
+        name = params.get("name")
+        if not isinstance(name, str) or not name:
+            errors.append((index, f"{step_type} needs a non-empty string params.name"))
+        if "value" not in params:
+            errors.append((index, f"{step_type} needs params.value"))
+        scope = params.setdefault("scope", DEFAULT_SCOPE)
+        if not isinstance(scope, str):
+            errors.append((index, "params.scope must be a string"))
+    return PlanStep(action, step_type, step.get("code", ""), step.get("narration", ""), params)
+
+
+def compile_step(step, index=0):
+    """Validate and compile a single step, e.g. one arriving from a stream."""
+    errors = []
+    compiled = _check_step(step, errors, index)
+    if errors:
+        raise PlanError(errors)
+    return compiled
+
+
+def as_plan_step(step):
+    """`step` as a PlanStep, compiling it if it is still a keyframe dict."""
+    return step if isinstance(step, PlanStep) else compile_step(step)
+
+
+class Plan:
+    __slots__ = ("steps", "total_vars")
+
+    def __init__(self, steps, total_vars):
+        self.steps = tuple(steps)
+        self.total_vars = total_vars
+
+    def __len__(self):
+        return len(self.steps)
+
+    def sequence(self):
+        """The steps as keyframe dicts."""
+        return [step.as_dict() for step in self.steps]
+
+    def to_dict(self):
+        return {"plan_version": PLAN_VERSION, "total_vars": self.total_vars, "sequence": self.sequence()}
+
+    @classmethod
+    def from_dict(cls, d):
+        """Load a plan written by `to_dict`; its steps are trusted, not validated again."""
+        if d.get("plan_version") != PLAN_VERSION:
+            raise PlanError([(None, f"plan version {d.get('plan_version')!r} is not {PLAN_VERSION}; recompile it")])
+        steps = [PlanStep(Action(s["action"]), s["type"], s["code"], s["narration"], s["params"]) for s in d["sequence"]]
+        return cls(steps, d["total_vars"])
+
+
+def compile_plan(script_data):
+    """Validate a whole script and compile it into a `Plan`, raising `PlanError` with every problem found.
+
+    Accepts anything `load_script` does, a saved plan (its `to_dict()`), or a
+    `Plan`, which is returned as is.
+    """
+    if isinstance(script_data, Plan):
+        return script_data
+    try:
+        data = load_script(script_data)
+    except json.JSONDecodeError as e:
+        raise PlanError([(None, f"invalid JSON: {e}")]) from None
+    if not isinstance(data, dict):
+        raise PlanError([(None, "expected an object with a 'sequence' list")])
+    if "plan_version" in data:
+        return Plan.from_dict(data)
+    sequence = data.get("sequence")
+    if not isinstance(sequence, list):
+        raise PlanError([(None, "'sequence' must be a list of steps")])
+
+    errors = []
+    steps = [_check_step(step, errors, i) for i, step in enumerate(sequence)]
+    if errors:
+        raise PlanError(errors)
+    return Plan(steps, count_var_creates([step._asdict() for step in steps]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a keyframe script and write its compiled plan")
+    parser.add_argument("input", help="Keyframe JSON or NDJSON file")
+    parser.add_argument("--output", "-o", help="Write the compiled plan here (default: only validate)")
+    args = parser.parse_args(argv)
+
+    with open(args.input, "r", encoding="utf-8") as fh:
+        source = fh.read()
+    try:
+        plan = compile_plan(source)
+    except PlanError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(plan.to_dict(), fh)
+    print(f"OK: {len(plan)} steps, {plan.total_vars} variable slots")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Rendition ladder: the resolutions and bitrates a render can be published at.
+
+The scene is rasterized once at the largest requested rendition and every
+rendition is then scaled and encoded from that master in a single ffmpeg
+pass (`ffmpeg.encode_renditions`), so TTS, mobject construction and
+rasterization are never repeated per resolution. The master is rasterized at
+the top resolution and 30 fps, though, which a low-quality single render is
+not; whether the ladder wins for a given script is what
+`benchmarks/bench_renditions.py` measures.
+"""
+import os
+from typing import NamedTuple
+
+
+class Rendition(NamedTuple):
+    name: str
+    width: int
+    height: int
+    bitrate: str
+
+
+LADDER = {
+    r.name: r for r in (
+        Rendition("360p", 640, 360, "700k"),
+        Rendition("480p", 854, 480, "1200k"),
+        Rendition("720p", 1280, 720, "2800k"),
+        Rendition("1080p", 1920, 1080, "5000k"),
+    )
+}
+# Frame rate of the master a ladder is encoded from
+LADDER_FRAME_RATE = 30
+
+
+def resolve_renditions(names):
+    """Ladder entries for `names`, largest first; raises ValueError on an unknown name."""
+    unknown = [n for n in names if n not in LADDER]
+    if unknown:
+        raise ValueError(f"unknown rendition(s) {unknown}; expected some of {list(LADDER)}")
+    return sorted({LADDER[n] for n in names}, key=lambda r: r.height, reverse=True)
+
+
+def rendition_paths(output_path, renditions):
+    """`video.mp4` -> {"720p": "video_720p.mp4", ...}, next to `output_path`."""
+    stem, ext = os.path.splitext(os.path.abspath(output_path))
+    return {r.name: f"{stem}_{r.name}{ext or '.mp4'}" for r in renditions}
@@ -0,0 +1,249 @@
+"""Segment-based rendering: keyframe steps are rendered as independent segments.
+
+A segment is keyed by a hash of everything that can change its pixels or
+sound: the step JSON, the layout state it starts from (replayed with
+`layout.replay_states`), its narration audio and the quality settings.
+Segments live in a cache directory, so after an edit only the dirty steps are
+re-rendered and the final video is stitched together with a stream-copy concat.
+Since a segment depends only on its own inputs, dirty segments can also be
+rendered in parallel, one process per core. The cache is capped by size:
+after each render the least recently used segments are pruned (see
+`prune_segment_cache`).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from manim import config, logger, tempconfig
+from pydub import AudioSegment
+
+from .engine import CodeAnimatorEngine, TTSService
+from .ffmpeg import concat_copy
+from .layout import DEFAULT_VISIBLE_SLOTS, replay_states
+from .narration import NARRATION_FRAME_RATE
+from .plan import compile_plan
+
+# Bump whenever the engine's drawing code changes so stale segments are not reused
+SEGMENT_FORMAT_VERSION = 5
+# gTTS produces 24 kHz audio; silent padding uses the same rate so all segments share one audio layout
+SEGMENT_AUDIO_RATE = NARRATION_FRAME_RATE
+DEFAULT_SEGMENT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# Segments used this recently are never pruned: another render may be about to concatenate them
+SEGMENT_PRUNE_GRACE = 60 * 60
+
+
+class SegmentScene(CodeAnimatorEngine):
+    """Renders a contiguous run of steps starting from a replayed `LayoutState`."""
+
+    def __init__(self, steps, start_state, total_vars, narrations, **kwargs):
+        self.steps = steps
+        self.start_state = start_state
+        self.total_vars = total_vars
+        self.narrations = narrations
+        super().__init__(script_data=None, **kwargs)
+
+    def construct(self):
+        self.setup_ui(self.start_state, self.total_vars)
+        for step, audio in zip(self.steps, self.narrations):
+            self.play_step(step, audio, self.total_vars)
+
+        # Every segment carries an audio stream, even without narration, so they concat cleanly
+        if self.premix_audio:
+            self.mix_narration(duration=self.renderer.time)
+        else:
+            silence = AudioSegment.silent(duration=int(self.renderer.time * 1000), frame_rate=SEGMENT_AUDIO_RATE)
+            self.renderer.file_writer.add_audio_segment(silence, time=0)
+
+
+def quality_settings():
+    """The parts of the current manim config that affect a segment's output."""
+    return {
+        "pixel_width": config.pixel_width,
+        "pixel_height": config.pixel_height,
+        "frame_rate": config.frame_rate,
+    }
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def segment_key(steps, start_state, total_vars, narrations, quality, visible_slots=DEFAULT_VISIBLE_SLOTS,
+                hold_waits=False):
+    audio = [
+        [_file_digest(path) if path else None, duration]
+        for path, duration in narrations
+    ]
+    payload = {
+        "version": SEGMENT_FORMAT_VERSION,
+        "steps": steps,
+        "state": start_state.to_dict(),
+        "total_vars": total_vars,
+        "visible_slots": visible_slots,
+        "hold_waits": hold_waits,
+        "audio": audio,
+        "quality": quality,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def render_segment(steps, start_state, total_vars, narrations, quality, output_path,
+                   visible_slots=DEFAULT_VISIBLE_SLOTS, hold_waits=False):
+    """Render one segment into `output_path` using a private, throwaway media dir."""
+    work_dir = tempfile.mkdtemp(prefix="segment_")
+    try:
+        with tempconfig({}):
+            config.media_dir = work_dir
+            config.verbosity = "WARNING"
+            config.preview = False
+            config.pixel_width = quality["pixel_width"]
+            config.pixel_height = quality["pixel_height"]
+            config.frame_rate = quality["frame_rate"]
+
+            scene = SegmentScene(steps, start_state, total_vars, narrations, visible_slots=visible_slots,
+                                 hold_waits=hold_waits)
+            scene.render()
+            movie_path = scene.renderer.file_writer.movie_file_path
+
+        # Publish atomically so a crashed render never leaves a half-written cache entry
+        partial_path = f"{output_path}.{os.getpid()}.part"
+        shutil.move(str(movie_path), partial_path)
+        os.replace(partial_path, output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return output_path
+
+
+def prune_segment_cache(cache_dir, max_bytes, grace=SEGMENT_PRUNE_GRACE):
+    """Delete least recently used segments from `cache_dir` until it fits in `max_bytes`.
+
+    Recency is the segment file's mtime, which `render_segmented` touches on
+    every reuse. Segments used within `grace` seconds are kept even if the
+    cache stays over budget. Returns the number of segments deleted.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".mp4"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    cutoff = time.time() - grace
+    pruned = 0
+    for mtime, size, path in entries:
+        if total <= max_bytes or mtime > cutoff:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+        pruned += 1
+    return pruned
+
+
+def split_sequence(n_steps, n_segments):
+    """Split ``range(n_steps)`` into at most `n_segments` contiguous (start, end) ranges of near-equal size."""
+    n_segments = max(1, min(n_segments, n_steps))
+    base, extra = divmod(n_steps, n_segments)
+    bounds = []
+    start = 0
+    for i in range(n_segments):
+        end = start + base + (1 if i < extra else 0)
+        if end > start:
+            bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def render_segmented(json_input, output_path, segment_cache_dir=None, audio_cache=None, tts_concurrency=4,
+                     workers=1, segment_size=None, audio_dir=".", visible_slots=DEFAULT_VISIBLE_SLOTS,
+                     hold_waits=False, layout=None, segment_cache_max_bytes=DEFAULT_SEGMENT_CACHE_MAX_BYTES):
+    """Render the script as independent segments and stitch them into `output_path`.
+
+    Segments are cut at step boundaries; each starts from the layout state
+    replayed up to its first step. With `segment_cache_dir` set, segments are
+    kept there and only missing ones are rendered. With ``workers > 1`` dirty
+    segments are rendered in a process pool (``workers=None`` uses one worker
+    per core). `segment_size` defaults to one step per segment when caching,
+    otherwise to an even split across the workers. Once the video is written
+    the cache is pruned to `segment_cache_max_bytes` (None for no cap).
+
+    Uncached narration audio is written to `audio_dir`. The segments are
+    concatenated straight into `output_path`, which may also be a writable
+    binary file object; `layout` selects the MP4 layout (see `ffmpeg.remux`).
+
+    Returns `output_path`, or None if the script has no steps.
+    """
+    plan = compile_plan(json_input)
+    sequence = plan.sequence()
+    total_vars = plan.total_vars
+    quality = quality_settings()
+    workers = workers or os.cpu_count() or 1
+
+    if not sequence:
+        return None
+    if segment_size is None:
+        segment_size = 1 if segment_cache_dir else -(-len(sequence) // workers)
+    bounds = split_sequence(len(sequence), -(-len(sequence) // max(segment_size, 1)))
+
+    narrations = TTSService(cache=audio_cache, output_dir=audio_dir).prefetch(
+        [step.get("narration", "") for step in sequence],
+        max_workers=tts_concurrency,
+    )
+    states = list(replay_states(sequence))
+
+    scratch_dir = None
+    if segment_cache_dir is None:
+        segment_cache_dir = scratch_dir = tempfile.mkdtemp(prefix="segments_")
+    os.makedirs(segment_cache_dir, exist_ok=True)
+
+    try:
+        segment_paths = []
+        dirty = []
+        for start, end in bounds:
+            steps = sequence[start:end]
+            audio = [narrations.get(i, (None, 0)) for i in range(start, end)]
+            key = segment_key(steps, states[start], total_vars, audio, quality, visible_slots, hold_waits)
+            path = os.path.join(segment_cache_dir, f"{key}.mp4")
+            try:
+                # Mark as recently used, so pruning drops segments no script has needed for longest
+                os.utime(path)
+            except FileNotFoundError:
+                dirty.append((steps, states[start], total_vars, audio, quality, path, visible_slots, hold_waits))
+            segment_paths.append(path)
+
+        if workers > 1 and len(dirty) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(dirty))) as pool:
+                futures = [pool.submit(render_segment, *job) for job in dirty]
+                for future in futures:
+                    future.result()
+        else:
+            for job in dirty:
+                render_segment(*job)
+
+        logger.info(f"Segments: {len(dirty)} rendered, {len(segment_paths) - len(dirty)} reused")
+        # Re-encode only the (cheap) audio so each segment's sound starts exactly at its video boundary
+        concat_copy(segment_paths, output_path, audio_codec="aac", layout=layout)
+        if not scratch_dir and segment_cache_max_bytes is not None:
+            pruned = prune_segment_cache(segment_cache_dir, segment_cache_max_bytes)
+            if pruned:
+                logger.info(f"Segments: {pruned} pruned from the cache")
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    return output_path
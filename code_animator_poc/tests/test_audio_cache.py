@@ -0,0 +1,77 @@
+import os
+from code_animator_poc.audio_cache import AudioCache
+
+
+def _make_clip(tmp_path, name, size):
+    p = tmp_path / name
+    p.write_bytes(b"\0" * size)
+    return str(p)
+
+
+def test_put_then_get_hit(tmp_path):
+    cache = AudioCache(str(tmp_path / "cache"))
+    key = cache.make_key("Hello world", "en", "gtts")
+    assert cache.get(key) is None
+
+    cached_path = cache.put(key, _make_clip(tmp_path, "clip.mp3", 10), 1.25)
+    assert os.path.exists(cached_path)
+    assert cache.get(key) == (cached_path, 1.25)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["entries"] == 1 and stats["bytes"] == 10
+
+
+def test_key_depends_on_text_language_and_backend():
+    keys = {
+        AudioCache.make_key("hi", "en", "gtts"),
+        AudioCache.make_key("hi", "fr", "gtts"),
+        AudioCache.make_key("hi", "en", "other"),
+        AudioCache.make_key("hi!", "en", "gtts"),
+    }
+    assert len(keys) == 4
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path / "cache"), max_bytes=25)
+    a, b, c = (cache.make_key(t) for t in ("a", "b", "c"))
+    path_a = cache.put(a, _make_clip(tmp_path, "a.mp3", 10), 1.0)
+    path_b = cache.put(b, _make_clip(tmp_path, "b.mp3", 10), 1.0)
+    # make `a` the most recently used entry
+    os.utime(path_b, (1000, 1000))
+    os.utime(path_a, (2000, 2000))
+
+    cache.put(c, _make_clip(tmp_path, "c.mp3", 10), 1.0)
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None
+    assert cache.get(c) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_keeps_existing_entry_and_counts_it_once(tmp_path):
+    cache = AudioCache(str(tmp_path / "cache"))
+    key = cache.make_key("same text")
+    first = cache.put(key, _make_clip(tmp_path, "first.mp3", 10), 1.0)
+    second_src = _make_clip(tmp_path, "second.mp3", 30)
+
+    assert cache.put(key, second_src, 2.0) == first
+    assert cache.get(key) == (first, 1.0)
+    assert os.path.getsize(first) == 10 and os.path.exists(second_src)
+    assert cache._approx_bytes == 10
+    assert sorted(os.listdir(cache.cache_dir)) == [f"{key}.json", f"{key}.mp3"]
+
+
+def test_eviction_spares_recently_used_entries(tmp_path):
+    cache = AudioCache(str(tmp_path / "cache"), max_bytes=15, evict_grace=60)
+    old, recent = cache.make_key("old"), cache.make_key("recent")
+    path_old = cache.put(old, _make_clip(tmp_path, "old.mp3", 10), 1.0)
+    os.utime(path_old, (1000, 1000))
+
+    # Over budget, but only the stale entry may go; the fresh one is in use
+    cache.put(recent, _make_clip(tmp_path, "recent.mp3", 10), 1.0)
+    assert cache.get(old) is None and cache.get(recent) is not None
+
+    cache.put(cache.make_key("another"), _make_clip(tmp_path, "another.mp3", 10), 1.0)
+    assert cache.get(recent) is not None
+    assert cache.stats()["bytes"] == 20
@@ -0,0 +1,15 @@
+from code_animator_poc.batch import RenderResult, render_batch
+
+
+def test_failed_job_is_reported_without_stopping_batch(tmp_path):
+    jobs = [
+        (str(tmp_path / "missing_a.json"), str(tmp_path / "a.mp4")),
+        (str(tmp_path / "missing_b.json"), str(tmp_path / "b.mp4")),
+    ]
+    results = list(render_batch(jobs, workers=2, audio_cache_dir=None))
+
+    assert len(results) == 2
+    assert all(isinstance(r, RenderResult) for r in results)
+    assert sorted(r.output_path for r in results) == sorted(str(tmp_path / n) for n in ("a.mp4", "b.mp4"))
+    assert not any(r.ok for r in results)
+    assert all(r.error for r in results)
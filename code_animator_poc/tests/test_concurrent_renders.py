@@ -0,0 +1,76 @@
+import json
+import shutil
+import subprocess
+import threading
+import pytest
+
+pytest.importorskip("manim")
+if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+    pytest.skip("needs ffmpeg and ffprobe", allow_module_level=True)
+
+from code_animator_poc import engine  # noqa: E402
+from code_animator_poc.batch import render_batch  # noqa: E402
+
+
+def _script(n_steps):
+    return {"sequence": [
+        {"type": "VarCreate", "code": f"v{i} = {i}", "narration": f"v{i}",
+         "params": {"name": f"v{i}", "value": i}}
+        for i in range(n_steps)
+    ]}
+
+
+def _probe(path):
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height:format=duration",
+         "-of", "json", path],
+        capture_output=True, check=True,
+    )
+    info = json.loads(out.stdout)
+    stream = info["streams"][0]
+    return stream["width"], stream["height"], float(info["format"]["duration"])
+
+
+@pytest.fixture(autouse=True)
+def offline_tts(monkeypatch):
+    # Synthesis fails fast, so every narration falls back to a fixed duration
+    def fail(*args, **kwargs):
+        raise OSError("offline")
+    monkeypatch.setattr(engine, "gTTS", fail)
+
+
+def test_threaded_renders_with_different_settings_are_both_correct(tmp_path):
+    results = {}
+
+    def render(name, script, **options):
+        results[name] = engine.render_code_animation(script, str(tmp_path / f"{name}.mp4"),
+                                                     audio_cache_dir=None, **options)
+
+    threads = [
+        threading.Thread(target=render, args=("short", _script(1))),
+        threading.Thread(target=render, args=("long", _script(3)), kwargs={"renditions": ["360p"]}),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    short_w, short_h, short_duration = _probe(results["short"])
+    long_w, long_h, long_duration = _probe(results["long"]["360p"])
+    assert (long_w, long_h) == (640, 360)
+    assert (short_w, short_h) != (640, 360)
+    assert long_duration > short_duration + 2
+
+
+def test_batch_jobs_render_side_by_side(tmp_path):
+    jobs = []
+    for name, n_steps in (("one", 1), ("three", 3)):
+        src = tmp_path / f"{name}.json"
+        src.write_text(json.dumps(_script(n_steps)))
+        jobs.append((str(src), str(tmp_path / "out" / f"{name}.mp4")))
+
+    results = {r.output_path: r for r in render_batch(jobs, workers=2, audio_cache_dir=None)}
+
+    assert all(r.ok for r in results.values())
+    one, three = (_probe(dst)[2] for _, dst in jobs)
+    assert three > one + 2
@@ -0,0 +1,95 @@
+import json
+import time
+import pytest
+from code_animator_poc.audio_cache import AudioCache
+from code_animator_poc.dryrun import FRAME_TOP, estimate_audio_seconds, main, plan_timeline, step_seconds
+from code_animator_poc.plan import PlanError
+
+
+def _step(name, value, scope="Global Frame", narration=None):
+    return {
+        "type": "VarCreate",
+        "code": f"{name} = {value}",
+        "narration": narration if narration is not None else f"We set {name} to {value}.",
+        "params": {"name": name, "value": value, "scope": scope},
+    }
+
+
+def test_step_seconds_matches_engine_timing():
+    assert step_seconds(0) == pytest.approx(1.6)
+    assert step_seconds(1.0) == pytest.approx(1.6)
+    assert step_seconds(4.0) == pytest.approx(4.1)
+
+
+def test_timeline_uses_cached_durations_and_estimates(tmp_path):
+    cache = AudioCache(str(tmp_path / "tts"))
+    clip = tmp_path / "clip.mp3"
+    clip.write_bytes(b"\0")
+    cache.put(cache.make_key("We set a to 1.", "en", "gtts"), str(clip), 3.0)
+
+    plan = plan_timeline({"sequence": [_step("a", 1), _step("b", 2), _step("c", 3, narration="")]}, audio_cache=cache)
+    a, b, c = plan["steps"]
+    assert (a["audio"], a["audio_source"]) == (3.0, "cache")
+    assert b["audio_source"] == "estimate" and b["audio"] == pytest.approx(estimate_audio_seconds("We set b to 2."))
+    assert c["audio_source"] == "none"
+    assert a["start"] == 0 and b["start"] == pytest.approx(a["end"]) and c["start"] == pytest.approx(b["end"])
+    assert plan["duration"] == pytest.approx(c["end"])
+    # a dry run neither counts lookups nor touches the cache
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+
+
+def test_slot_positions_and_overflow_without_window():
+    plan = plan_timeline({"sequence": [_step(f"v{i}", i) for i in range(8)]}, visible_slots=None)
+    ys = [s["y"] for s in plan["slots"]]
+    assert ys == sorted(ys) and ys[1] - ys[0] == pytest.approx(1.2)
+    assert plan["stacks"][0]["capacity"] == 8
+    assert any(o["kind"] == "slot" and o["name"] == "v7" for o in plan["overflows"])
+
+    small = plan_timeline({"sequence": [_step("a", 1), _step("b", 2)]}, visible_slots=None)
+    assert small["overflows"] == []
+    assert all(s["y"] + 0.5 <= FRAME_TOP for s in small["slots"])
+
+
+def test_streams_plan_growable_stacks_without_window():
+    steps = [_step("a", 1), _step("b", 2), _step("c", 3, scope="f()")]
+    plan = plan_timeline((json.dumps(s) for s in steps), visible_slots=None)
+    g, f = plan["stacks"]
+    assert g["capacity"] == 2 and g["bottom"] == f["bottom"] == -3.0
+    assert f["capacity"] == 3
+    assert [s["scope"] for s in plan["slots"]] == ["Global Frame", "Global Frame", "f()"]
+
+
+def test_visible_window_keeps_layout_on_screen():
+    steps = [_step(f"v{i}", i) for i in range(50)] + [_step("r", 0, scope="f()"), _step("w", 1)]
+    plan = plan_timeline({"sequence": steps}, visible_slots=4)
+
+    assert plan["overflows"] == []
+    assert [s["capacity"] for s in plan["stacks"]] == [4, 4, 4]
+    # back in the global frame: its newest variables, with w in the next slot
+    assert [(s["slot"], s["name"]) for s in plan["slots"]] == [(0, "v47"), (1, "v48"), (2, "v49"), (3, "w")]
+    assert all(s["scope"] == "Global Frame" for s in plan["slots"])
+
+
+def test_thousand_steps_is_fast():
+    script = {"sequence": [_step(f"v{i}", i, scope=f"f{i // 5}()") for i in range(1000)]}
+    for visible_slots, n_slots in ((4, 4), (None, 1000)):
+        start = time.perf_counter()
+        plan = plan_timeline(script, visible_slots=visible_slots)
+        assert time.perf_counter() - start < 0.5
+        assert len(plan["steps"]) == 1000 and len(plan["slots"]) == n_slots
+
+
+def test_bad_steps_raise_plan_error():
+    bad = {"type": "VarCreate", "code": "x = 1", "params": {"value": 1}}
+    with pytest.raises(PlanError, match="step 1"):
+        plan_timeline({"sequence": [_step("a", 1), bad]})
+    # Streamed steps are checked as they arrive
+    with pytest.raises(PlanError, match="step 1"):
+        plan_timeline(iter([_step("a", 1), bad]))
+
+
+def test_main_reports_plan_errors(tmp_path, capsys):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"sequence": [{"type": "VarCreate", "params": {"value": 1}}]}))
+    assert main([str(path), "--no-audio-cache"]) == 1
+    assert "params.name" in capsys.readouterr().err
@@ -0,0 +1,99 @@
+import io
+import os
+import stat
+import sys
+import pytest
+from code_animator_poc import ffmpeg
+
+# Stands in for ffmpeg: concatenates the files of a concat list (or copies the input) into every
+# output, temp paths or pipe:1, and fails halfway through when FAKE_FFMPEG_FAIL is set
+FAKE_FFMPEG = f"""#!{sys.executable}
+import os, sys
+args = sys.argv[1:]
+src = args[args.index("-i") + 1]
+if "concat" in args:
+    paths = [line.strip()[6:-1] for line in open(src) if line.startswith("file ")]
+else:
+    paths = [src]
+data = b"".join(open(p, "rb").read() for p in paths)
+outs = [sys.stdout.buffer] if args[-1] == "pipe:1" else [open(a, "wb") for a in args if ".partial" in a]
+for out in outs:
+    out.write(data[:len(data) // 2])
+    out.flush()
+if os.environ.get("FAKE_FFMPEG_FAIL"):
+    sys.stderr.write("boom")
+    sys.exit(1)
+for out in outs:
+    out.write(data[len(data) // 2:])
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    path = tmp_path / "ffmpeg"
+    path.write_text(FAKE_FFMPEG)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(ffmpeg, "FFMPEG", str(path))
+    clips = []
+    for i, payload in enumerate([b"first-clip|", b"second-clip"]):
+        clip = tmp_path / f"clip{i}.mp4"
+        clip.write_bytes(payload)
+        clips.append(str(clip))
+    return clips
+
+
+def test_concat_to_path_lands_complete(tmp_path, fake_ffmpeg):
+    out = tmp_path / "out" / "video.mp4"
+    out.parent.mkdir()
+    ffmpeg.concat_copy(fake_ffmpeg, str(out), layout="faststart")
+    assert out.read_bytes() == b"first-clip|second-clip"
+    assert os.listdir(out.parent) == ["video.mp4"]
+
+
+def test_failed_concat_leaves_destination_untouched(tmp_path, fake_ffmpeg, monkeypatch):
+    out = tmp_path / "video.mp4"
+    out.write_bytes(b"previous render")
+    monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+    with pytest.raises(RuntimeError, match="boom"):
+        ffmpeg.concat_copy(fake_ffmpeg, str(out))
+    assert out.read_bytes() == b"previous render"
+    assert not [name for name in os.listdir(tmp_path) if ".partial" in name]
+
+
+def test_concat_and_remux_stream_into_file_objects(fake_ffmpeg):
+    stream = io.BytesIO()
+    ffmpeg.concat_copy(fake_ffmpeg, stream)
+    assert stream.getvalue() == b"first-clip|second-clip"
+
+    stream = io.BytesIO()
+    ffmpeg.remux(fake_ffmpeg[1], stream, layout="faststart")
+    assert stream.getvalue() == b"second-clip"
+
+
+def test_remux_to_path(tmp_path, fake_ffmpeg):
+    out = tmp_path / "remuxed.mp4"
+    ffmpeg.remux(fake_ffmpeg[0], str(out))
+    assert out.read_bytes() == b"first-clip|"
+
+
+def test_renditions_land_together(tmp_path, fake_ffmpeg, monkeypatch):
+    outputs = [(str(tmp_path / f"video_{h}p.mp4"), h * 16 // 9, h, rate) for h, rate in ((720, "2.8M"), (360, 700))]
+    assert ffmpeg.encode_renditions(fake_ffmpeg[0], outputs) == [path for path, _, _, _ in outputs]
+    for path, _, _, _ in outputs:
+        assert open(path, "rb").read() == b"first-clip|"
+
+    for path, _, _, _ in outputs:
+        os.remove(path)
+    monkeypatch.setenv("FAKE_FFMPEG_FAIL", "1")
+    with pytest.raises(RuntimeError, match="boom"):
+        ffmpeg.encode_renditions(fake_ffmpeg[0], outputs)
+    assert sorted(os.listdir(tmp_path)) == ["clip0.mp4", "clip1.mp4", "ffmpeg"]
+
+
+def test_parse_kbps():
+    assert ffmpeg.parse_kbps("2800k") == 2800
+    assert ffmpeg.parse_kbps("2.5M") == 2500
+    assert ffmpeg.parse_kbps("2500000") == 2500
+    assert ffmpeg.parse_kbps(1200) == 1200
+    with pytest.raises(ValueError, match="fast"):
+        ffmpeg.parse_kbps("fast")
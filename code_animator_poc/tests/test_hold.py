@@ -0,0 +1,79 @@
+import shutil
+import subprocess
+import pytest
+
+pytest.importorskip("manim")
+if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+    pytest.skip("needs ffmpeg and ffprobe", allow_module_level=True)
+
+from manim import BLUE, RIGHT, UP, Square, Text, config, tempconfig  # noqa: E402
+from code_animator_poc.engine import CodeAnimatorEngine  # noqa: E402
+
+FRAME_RATE = 15
+WIDTH, HEIGHT = 320, 180
+
+
+class _WaitScene(CodeAnimatorEngine):
+    hold_seconds = 1.2
+    move_seconds = 0.4
+
+    def construct(self):
+        square = Square(color=BLUE, fill_opacity=1)
+        self.add(square, Text("held").to_edge(UP))
+        self.wait(0.2)
+        if self.hold_waits:
+            self.hold(self.hold_seconds)
+        else:
+            self.wait(self.hold_seconds)
+        # A play manim has no cached partial for, so it opens a pipe right after the hold
+        self.play(square.animate.shift(2 * RIGHT), run_time=self.move_seconds)
+
+
+def _render(tmp_path, hold):
+    with tempconfig({}):
+        config.media_dir = str(tmp_path / ("hold" if hold else "wait"))
+        config.pixel_width, config.pixel_height, config.frame_rate = WIDTH, HEIGHT, FRAME_RATE
+        config.verbosity = "WARNING"
+        scene = _WaitScene({"sequence": []}, audio_dir=str(tmp_path), hold_waits=hold, premix_audio=False)
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+
+def _duration(path):
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True, check=True,
+    )
+    return float(out.stdout)
+
+
+def _frames(path):
+    out = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+        capture_output=True, check=True,
+    )
+    # Any decoding problem (e.g. parameter sets that don't fit a clip) shows up on stderr
+    assert out.stderr == b""
+    size = WIDTH * HEIGHT * 3
+    return [out.stdout[i:i + size] for i in range(0, len(out.stdout), size)]
+
+
+def _mean_diff(a, b):
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def test_held_wait_matches_regular_wait(tmp_path):
+    held_path = _render(tmp_path, hold=True)
+    held = _frames(held_path)
+    waited = _frames(_render(tmp_path, hold=False))
+    seconds = 0.2 + _WaitScene.hold_seconds + _WaitScene.move_seconds
+    assert len(held) == len(waited) == round(seconds * FRAME_RATE)
+    assert _duration(held_path) == pytest.approx(seconds, abs=1.5 / FRAME_RATE)
+    # The move after the hold was combined from its own clip: the square ends up moved, as without the hold
+    last_held = round((0.2 + _WaitScene.hold_seconds) * FRAME_RATE) - 1
+    assert _mean_diff(held[-1], held[last_held]) > 2.0
+    assert _mean_diff(held[-1], waited[-1]) < 2.0
+
+    # A frame in the middle of the hold, which is a re-encoded clone in the held render
+    i = round((0.2 + _WaitScene.hold_seconds / 2) * FRAME_RATE)
+    assert _mean_diff(held[i], waited[i]) < 2.0
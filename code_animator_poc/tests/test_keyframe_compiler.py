@@ -0,0 +1,71 @@
+import glob
+import os
+import time
+from ast_service import parse_code
+from code_animator_poc.keyframe_compiler import compile_files, compile_keyframes, compile_source, expr_to_source
+
+SNIPPETS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "ast_service", "code_snippets", "*.py")))
+
+
+def _types(script):
+    return [step["type"] for step in script["sequence"]]
+
+
+def test_assignments_and_scopes():
+    source = "x = 5\ndef add(a, b):\n    total = a + b\n    return total\nx = add(x, 1)\n"
+    steps = compile_source(source)["sequence"]
+
+    assert _types({"sequence": steps}) == ["VarCreate", "FuncCreate", "VarCreate", "Return", "VarUpdate"]
+    assert steps[0]["params"] == {"name": "x", "value": 5, "type": "int", "scope": "Global Frame"}
+    assert steps[1]["params"]["args"] == ["a", "b"]
+    assert steps[2]["params"]["scope"] == "add()"
+    assert steps[2]["params"]["value"] == "a + b"
+    assert steps[3]["narration"] == "The function returns total."
+    assert steps[4]["code"] == "x = add(x, 1)"
+    assert steps[4]["narration"].startswith("We update x")
+
+
+def test_control_flow_steps():
+    source = (
+        "n = 3\n"
+        "while n > 0:\n"
+        "    n -= 1\n"
+        "for i in range(2):\n"
+        "    if i == 0:\n"
+        "        print('zero')\n"
+        "    elif i == 1:\n"
+        "        print('one')\n"
+        "    else:\n"
+        "        print('other')\n"
+    )
+    script = compile_source(source)
+    assert _types(script) == ["VarCreate", "Loop", "VarUpdate", "Loop", "If", "Call", "If", "Call", "Else", "Call"]
+    loop = script["sequence"][3]
+    assert loop["params"]["kind"] == "for" and loop["params"]["iter"] == "range(2)"
+    assert script["sequence"][6]["code"] == "elif i == 1:"
+    assert script["sequence"][2]["params"]["value"] == "n - 1"
+
+
+def test_code_lines_rebuilt_without_source():
+    ast_obj = parse_code("total = price * 2\nprint(total)\n")
+    steps = compile_keyframes(ast_obj)["sequence"]
+    assert [s["code"] for s in steps] == ["total = price * 2", "print(total)"]
+
+
+def test_expr_to_source():
+    ast_obj = parse_code("y = not a.b[0] and (c, ) or {'k': [1, 2]}\n")
+    assert expr_to_source(ast_obj["body"][0]["value"]) == "not a.b[0] and (c,) or {'k': [1, 2]}"
+
+
+def test_compiles_all_snippets_quickly():
+    start = time.perf_counter()
+    scripts = compile_files(SNIPPETS)
+    elapsed = time.perf_counter() - start
+
+    assert len(scripts) == len(SNIPPETS) >= 4
+    for script in scripts.values():
+        assert script["sequence"]
+        for step in script["sequence"]:
+            assert step["code"] and step["narration"]
+    # parse + compile is a few milliseconds per snippet
+    assert elapsed / len(SNIPPETS) < 0.05
@@ -0,0 +1,110 @@
+import json
+import os
+from code_animator_poc.layout import LayoutState, count_var_creates, is_stream, iter_steps, load_script, replay_states
+
+KEYFRAMES = os.path.join(os.path.dirname(__file__), "..", "assets", "jsonFiles", "keyframes1401.json")
+
+
+def _step(name, value, scope="Global Frame"):
+    return {
+        "type": "VarCreate",
+        "code": f"{name} = {value}",
+        "narration": f"Set {name}.",
+        "params": {"name": name, "value": value, "scope": scope},
+    }
+
+
+def test_replay_yields_state_before_each_step():
+    sequence = [_step("a", 1), {"type": "Print", "code": "print(a)", "narration": "Show a."}, _step("b", 2, "f()")]
+    states = list(replay_states(sequence))
+
+    assert len(states) == 3
+    assert states[0].code is None and states[0].variables == []
+    assert states[1].code == "a = 1" and states[1].variables == [("a", "1")]
+    assert states[2].subtitle == "Show a." and states[2].stacks == ["Global Frame"]
+
+    final = states[2].copy().apply(sequence[2])
+    assert final.stacks == ["Global Frame", "f()"]
+    assert final.variables == [("a", "1"), ("b", "2")]
+
+
+def test_state_round_trips_through_dict():
+    state = LayoutState("x = 1", "hello", ["main()"], [("x", "1")])
+    clone = LayoutState.from_dict(json.loads(json.dumps(state.to_dict())))
+    assert clone.to_dict() == state.to_dict()
+
+
+def test_keyframe_file_replays():
+    with open(KEYFRAMES, "r", encoding="utf-8") as fh:
+        data = load_script(fh.read())
+    sequence = data["sequence"]
+    assert count_var_creates(sequence) == 4
+    last = list(replay_states(sequence))[-1]
+    assert last.stacks == ["main()"]
+    assert [name for name, _ in last.variables] == ["user_count", "val", "temp"]
+
+
+def test_iter_steps_accepts_documents_ndjson_and_iterators():
+    steps = [_step("a", 1), _step("b", 2)]
+    ndjson = "\n".join(json.dumps(s) for s in steps) + "\n\n"
+
+    assert list(iter_steps({"sequence": steps})) == steps
+    assert list(iter_steps(json.dumps({"sequence": steps}))) == steps
+    assert list(iter_steps(ndjson)) == steps
+    assert list(iter_steps(iter(ndjson.splitlines(keepends=True)))) == steps
+    assert list(iter_steps(s for s in steps)) == steps
+    assert load_script(ndjson) == {"sequence": steps}
+    assert load_script(json.dumps(steps[0])) == {"sequence": steps[:1]}
+
+
+def test_iter_steps_is_lazy():
+    consumed = []
+
+    def producer():
+        for name in "abc":
+            consumed.append(name)
+            yield _step(name, 0)
+
+    stream = producer()
+    assert is_stream(stream) and not is_stream({"sequence": []})
+    first = next(iter_steps(stream))
+    assert first["params"]["name"] == "a" and consumed == ["a"]
+
+
+def test_visible_variables_window_follows_active_scope():
+    state = LayoutState()
+    for step in [_step("a", 1), _step("b", 2), _step("c", 3), _step("x", 9, "f()")]:
+        state.apply(step)
+    assert state.variable_scopes == ["Global Frame"] * 3 + ["f()"]
+    assert state.visible_variables(2) == [("x", "9")]
+
+    state.apply(_step("d", 4))
+    assert state.scope_variables("Global Frame") == [("a", "1"), ("b", "2"), ("c", "3"), ("d", "4")]
+    assert state.visible_variables(2) == [("c", "3"), ("d", "4")]
+    assert LayoutState.from_dict(state.to_dict()).visible_variables(2) == [("c", "3"), ("d", "4")]
+
+
+def _update(name, value, scope="Global Frame"):
+    step = _step(name, value, scope)
+    step["type"] = "VarUpdate"
+    return step
+
+
+def test_var_update_keeps_slot():
+    sequence = [_step("a", 1), _step("b", 2), _update("a", 5), _update("c", 7)]
+    state = LayoutState()
+    for step in sequence:
+        state.apply(step)
+
+    # updating a changes its value in place; c was never created, so it gets a new slot
+    assert state.variables == [("a", "5"), ("b", "2"), ("c", "7")]
+    assert state.slot_index == {"Global Frame": {"a": 0, "b": 1, "c": 2}}
+    assert count_var_creates(sequence) == 3
+    assert LayoutState.from_dict(state.to_dict()).slot_index == state.slot_index
+
+
+def test_loop_updates_keep_state_constant_in_size():
+    sequence = [_step("balance", 100)] + [_update("balance", 100 + i) for i in range(1000)]
+    last = list(replay_states(sequence))[-1]
+    assert last.variables == [("balance", "1098")]
+    assert count_var_creates(sequence) == 1
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("pydub")
+
+from pydub.generators import Sine  # noqa: E402
+from code_animator_poc.narration import NarrationTrack  # noqa: E402
+
+
+def _tone(ms, frame_rate=24000):
+    return Sine(440, sample_rate=frame_rate).to_audio_segment(duration=ms)
+
+
+def test_clips_are_placed_at_their_start_times():
+    track = NarrationTrack()
+    track.add(1.0, _tone(500))
+    track.add(0.0, _tone(250))
+    mixed = track.build(duration=3.0)
+
+    assert len(mixed) == 3000
+    assert mixed.frame_rate == 24000 and mixed.channels == 1
+    assert mixed[250:1000].rms == 0
+    assert mixed[1000:1500].rms > 0
+    assert mixed[1500:].rms == 0
+
+
+def test_overlapping_clip_is_overlaid():
+    track = NarrationTrack()
+    track.add(0.0, _tone(1000))
+    track.add(0.5, _tone(200))
+    mixed = track.build()
+    assert len(mixed) == 1000
+
+
+def test_clips_are_resampled_to_the_track_layout():
+    track = NarrationTrack()
+    track.add(0.0, _tone(100, frame_rate=44100).set_channels(2))
+    mixed = track.build()
+    assert mixed.frame_rate == 24000 and mixed.channels == 1
+    assert len(mixed) == 100
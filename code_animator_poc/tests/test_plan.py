@@ -0,0 +1,64 @@
+import json
+import os
+import pytest
+from code_animator_poc.plan import PLAN_VERSION, Action, Plan, PlanError, compile_plan, compile_step, main
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "assets", "jsonFiles")
+
+
+def _var(name, value, step_type="VarCreate", **params):
+    return {"type": step_type, "code": f"{name} = {value}", "narration": f"{name} is {value}.",
+            "params": {"name": name, "value": value, **params}}
+
+
+def test_compiles_steps_to_actions_with_default_scope():
+    plan = compile_plan({"sequence": [_var("a", 1), _var("a", 2, "VarUpdate"), {"type": "Return", "code": "return a"}]})
+    assert [s.action for s in plan.steps] == [Action.VAR_CREATE, Action.VAR_UPDATE, Action.RETURN]
+    assert plan.steps[0].params["scope"] == "Global Frame"
+    assert plan.steps[2].narration == "" and plan.steps[2].params == {}
+    assert plan.total_vars == 1
+    assert compile_step({"type": "Mystery"}).action == Action.OTHER
+
+
+def test_reports_every_error_with_its_step_index():
+    sequence = [
+        _var("a", 1),
+        {"code": "x"},
+        {"type": "VarCreate", "params": {"value": 1}},
+        "not a step",
+        {"type": "VarUpdate", "narration": 3, "params": {"name": "b"}},
+    ]
+    with pytest.raises(PlanError) as info:
+        compile_plan(json.dumps({"sequence": sequence}))
+
+    indices = [i for i, _ in info.value.errors]
+    assert indices == [1, 2, 3, 4, 4]
+    assert "step 3: expected an object" in str(info.value)
+
+
+def test_script_level_errors():
+    with pytest.raises(PlanError, match="invalid JSON"):
+        compile_plan('{"sequence": [')
+    with pytest.raises(PlanError, match="'sequence' must be a list"):
+        compile_plan({"sequence": {"type": "VarCreate"}})
+
+
+def test_plan_round_trips_without_revalidation():
+    plan = compile_plan({"sequence": [_var("a", 1), _var("b", "hi", scope="main")]})
+    saved = json.loads(json.dumps(plan.to_dict()))
+    loaded = compile_plan(saved)
+    assert loaded.steps == plan.steps and loaded.total_vars == plan.total_vars
+    assert compile_plan(loaded) is loaded
+
+    saved["plan_version"] = PLAN_VERSION + 1
+    with pytest.raises(PlanError, match="recompile"):
+        Plan.from_dict(saved)
+
+
+def test_bundled_scripts_compile(tmp_path, capsys):
+    path = os.path.join(ASSETS, "keyframes1401.json")
+    out = tmp_path / "plan.json"
+    assert main([path, "-o", str(out)]) == 0
+    with open(path, encoding="utf-8") as fh:
+        assert len(compile_plan(json.load(fh))) == len(json.loads(out.read_text())["sequence"])
+    assert capsys.readouterr().out.startswith("OK:")
@@ -0,0 +1,22 @@
+import os
+import pytest
+from code_animator_poc.renditions import rendition_paths, resolve_renditions
+
+
+def test_resolve_orders_largest_first_and_dedupes():
+    ladder = resolve_renditions(["480p", "1080p", "720p", "480p"])
+    assert [r.name for r in ladder] == ["1080p", "720p", "480p"]
+    assert (ladder[0].width, ladder[0].height) == (1920, 1080)
+
+
+def test_unknown_rendition_is_rejected():
+    with pytest.raises(ValueError, match="4k"):
+        resolve_renditions(["720p", "4k"])
+
+
+def test_rendition_paths_sit_next_to_output(tmp_path):
+    paths = rendition_paths(str(tmp_path / "video.mp4"), resolve_renditions(["720p", "360p"]))
+    assert paths == {
+        "720p": os.path.join(str(tmp_path), "video_720p.mp4"),
+        "360p": os.path.join(str(tmp_path), "video_360p.mp4"),
+    }
@@ -0,0 +1,44 @@
+import os
+import time
+import pytest
+
+pytest.importorskip("manim")
+
+from code_animator_poc.layout import LayoutState  # noqa: E402
+from code_animator_poc.segments import prune_segment_cache, segment_key, split_sequence  # noqa: E402
+
+QUALITY = {"pixel_width": 854, "pixel_height": 480, "frame_rate": 15}
+
+
+def test_split_sequence_covers_every_step_once():
+    bounds = split_sequence(10, 3)
+    assert bounds == [(0, 4), (4, 7), (7, 10)]
+    assert split_sequence(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_segment_key_changes_with_inputs():
+    step = {"type": "VarCreate", "code": "x = 1", "narration": "x", "params": {"name": "x", "value": 1}}
+    state = LayoutState()
+    key = segment_key([step], state, 1, [(None, 0)], QUALITY)
+
+    assert key == segment_key([dict(step)], LayoutState(), 1, [(None, 0)], QUALITY)
+    assert key != segment_key([dict(step, code="x = 2")], state, 1, [(None, 0)], QUALITY)
+    assert key != segment_key([step], LayoutState(code="y = 0"), 1, [(None, 0)], QUALITY)
+    assert key != segment_key([step], state, 1, [(None, 0)], dict(QUALITY, frame_rate=30))
+    assert key != segment_key([step], state, 1, [(None, 0)], QUALITY, hold_waits=True)
+
+
+def test_prune_segment_cache_drops_least_recently_used(tmp_path):
+    now = time.time()
+    for i, age in enumerate([5000, 4000, 3000, 10]):
+        path = tmp_path / f"seg{i}.mp4"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age, now - age))
+    (tmp_path / "seg9.mp4.123.part").write_bytes(b"x" * 100)
+
+    assert prune_segment_cache(str(tmp_path), max_bytes=250, grace=60) == 2
+    assert sorted(os.listdir(tmp_path)) == ["seg2.mp4", "seg3.mp4", "seg9.mp4.123.part"]
+
+    # Recently used segments stay even when the cache is still over budget
+    assert prune_segment_cache(str(tmp_path), max_bytes=0, grace=60) == 1
+    assert sorted(os.listdir(tmp_path)) == ["seg3.mp4", "seg9.mp4.123.part"]
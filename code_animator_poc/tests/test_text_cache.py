@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("manim")
+
+from code_animator_poc.text_cache import TextCache  # noqa: E402
+
+
+def test_hits_return_independent_copies():
+    cache = TextCache(max_entries=4)
+    first = cache.get("Global Frame", font_size=24)
+    second = cache.get("Global Frame", font_size=24)
+
+    assert first is not second
+    second.shift([1, 0, 0])
+    assert cache.get("Global Frame", font_size=24).get_center()[0] == pytest.approx(first.get_center()[0])
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_key_includes_style_and_evicts_lru():
+    cache = TextCache(max_entries=2)
+    cache.get("x", font_size=24)
+    cache.get("x", font_size=28)
+    cache.get("x", font_size=24)
+    cache.get("y", font_size=24)  # evicts ("x", 28)
+
+    assert cache.stats()["entries"] == 2
+    cache.get("x", font_size=28)
+    assert cache.stats()["misses"] == 4
@@ -0,0 +1,55 @@
+import json
+import pytest
+from code_animator_poc.tracing import NULL_TRACER, Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("play", step=1) as span:
+        span.set(frames=10)
+    tracer.record("encode", 0.0, 1.0)
+    assert tracer.spans == []
+    assert NULL_TRACER.span("a") is NULL_TRACER.span("b")
+
+
+def test_spans_carry_metadata_into_chrome_trace(tmp_path):
+    tracer = Tracer()
+    with tracer.span("step", step=0, action="VarCreate"):
+        with tracer.span("play") as span:
+            span.set(frames=45)
+
+    path = tracer.export_chrome(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as fh:
+        events = json.load(fh)["traceEvents"]
+
+    assert [e["name"] for e in events] == ["step", "play"]
+    step, play = events
+    assert step["ph"] == "X" and step["args"] == {"step": 0, "action": "VarCreate"}
+    assert play["args"] == {"frames": 45}
+    # the child span lies inside its parent
+    assert step["ts"] <= play["ts"] and play["ts"] + play["dur"] <= step["ts"] + step["dur"]
+
+
+def test_failed_span_is_recorded_with_error():
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.span("tts"):
+            raise ValueError("boom")
+    assert tracer.spans[0][4] == {"error": "ValueError"}
+
+
+def test_summary_aggregates_by_name():
+    tracer = Tracer()
+    tracer.record("play", 0.0, 1.5)
+    tracer.record("play", 2.0, 3.0)
+    tracer.record("wait", 1.5, 2.0)
+
+    play, wait = tracer.summary()
+    assert play["name"] == "play" and play["count"] == 2
+    assert play["total"] == pytest.approx(2.5)
+    assert play["mean"] == pytest.approx(1.25)
+    assert play["max"] == pytest.approx(1.5)
+    assert wait["count"] == 1
+
+    table = tracer.format_summary()
+    assert table.splitlines()[1].startswith("play")
@@ -0,0 +1,99 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("manim")
+
+from code_animator_poc import engine  # noqa: E402
+from code_animator_poc.engine import TTSService  # noqa: E402
+
+
+class FakeTTS:
+    """Stands in for gTTS: writes the text as the "audio" after a short delay, failing on "bad" texts."""
+    delay = 0.1
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    calls = []
+
+    def __init__(self, text, lang):
+        self.text = text
+
+    def save(self, filename):
+        cls = type(self)
+        with cls.lock:
+            cls.calls.append(self.text)
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(cls.delay)
+            if self.text.startswith("bad"):
+                raise RuntimeError("synthesis failed")
+            with open(filename, "w", encoding="utf-8") as fh:
+                fh.write(self.text)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+def fake_mp3(filename):
+    with open(filename, encoding="utf-8") as fh:
+        return SimpleNamespace(info=SimpleNamespace(length=len(fh.read()) / 10))
+
+
+@pytest.fixture
+def tts(tmp_path, monkeypatch):
+    monkeypatch.setattr(FakeTTS, "active", 0)
+    monkeypatch.setattr(FakeTTS, "peak", 0)
+    monkeypatch.setattr(FakeTTS, "calls", [])
+    monkeypatch.setattr(engine, "gTTS", FakeTTS)
+    monkeypatch.setattr(engine, "MP3", fake_mp3)
+    return TTSService(output_dir=str(tmp_path))
+
+
+def test_prefetch_overlaps_synthesis(tts):
+    texts = [f"step {i}" for i in range(8)]
+    start = time.perf_counter()
+    results = tts.prefetch(texts, max_workers=8)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(results) == list(range(8))
+    assert FakeTTS.peak > 1
+    assert elapsed < len(texts) * FakeTTS.delay / 2
+    assert [results[i][1] for i in range(8)] == [len(t) / 10 for t in texts]
+
+
+def test_prefetch_honours_concurrency_bound(tts):
+    tts.prefetch([f"step {i}" for i in range(9)], max_workers=3)
+    assert FakeTTS.peak == 3
+    assert len(FakeTTS.calls) == 9
+
+
+def test_failed_step_falls_back_alone(tts, monkeypatch):
+    results = tts.prefetch(["first", "bad one", "", "third"], max_workers=2)
+
+    assert sorted(results) == [0, 1, 3]
+    assert results[1] == (None, 2.0)
+    assert results[0][1] == len("first") / 10 and results[3][1] == len("third") / 10
+
+    # An error outside synthesis itself is contained to its step as well
+    original = tts.generate_audio
+
+    def generate_audio(text, i):
+        if text == "third":
+            raise OSError("disk full")
+        return original(text, i)
+
+    monkeypatch.setattr(tts, "generate_audio", generate_audio)
+    results = tts.prefetch(["first", "third"], max_workers=2)
+    assert results[1] == (None, 2.0)
+    assert results[0][0] is not None
+
+
+def test_repeated_texts_are_synthesized_once(tts):
+    results = tts.prefetch(["intro", "x = 1", "intro", "  ", "intro"], max_workers=4)
+
+    assert sorted(FakeTTS.calls) == ["intro", "x = 1"]
+    assert sorted(results) == [0, 1, 2, 4]
+    assert results[0] == results[2] == results[4]
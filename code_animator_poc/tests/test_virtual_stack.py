@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("manim")
+
+from manim import FadeOut  # noqa: E402
+from code_animator_poc.engine import CodeAnimatorEngine  # noqa: E402
+from code_animator_poc.tracing import NULL_TRACER  # noqa: E402
+
+
+def _scene(visible_slots):
+    return SimpleNamespace(tracer=NULL_TRACER, visible_slots=visible_slots, active_stack=None,
+                           scope_variables={}, slot_index={})
+
+
+def _create(scene, name, scope):
+    return CodeAnimatorEngine.virtual_var_create(scene, {"name": name, "value": 1, "scope": scope})
+
+
+def _family(mobject):
+    return set(map(id, mobject.get_family()))
+
+
+def test_reentering_a_full_frame_does_not_animate_a_block_twice():
+    scene = _scene(visible_slots=3)
+    for name in "abc":
+        _create(scene, name, "main")
+    _create(scene, "x", "helper")
+
+    animations = _create(scene, "d", "main")
+
+    assert not any(isinstance(a, FadeOut) and a.mobject in scene.active_stack.slots for a in animations)
+    assert [id(block) for block in scene.active_stack.slots] == \
+        [id(scene.active_stack.index[name]) for name in "bcd"]
+    # Every variable block is touched by exactly one set of animations
+    for block in scene.active_stack.slots:
+        touching = [a for a in animations if _family(a.mobject) & _family(block)]
+        assert touching and all(_family(a.mobject) <= _family(block) for a in touching)
+
+
+def test_push_into_a_full_window_scrolls():
+    scene = _scene(visible_slots=2)
+    for name in "ab":
+        _create(scene, name, "main")
+    animations = _create(scene, "c", "main")
+    assert any(isinstance(a, FadeOut) for a in animations)
+    assert list(scene.active_stack.index) == ["b", "c"]
@@ -0,0 +1,57 @@
+"""Bounded LRU cache of prebuilt `Text` mobjects.
+
+Building a `Text` runs Pango layout and SVG parsing, which dominates the cost
+of a step. Scripts repeat many strings (frame names, variable names, short
+code lines), so each distinct (text, font, font_size, color) is laid out once
+and callers receive a cheap `copy()` of the pristine original, which they are
+free to move, scale or transform.
+"""
+from collections import OrderedDict
+
+from manim import DEFAULT_FONT_SIZE, WHITE, Text
+
+
+class TextCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, text, font="", font_size=DEFAULT_FONT_SIZE, color=WHITE):
+        key = (text, font, font_size, str(color))
+        original = self._entries.get(key)
+        if original is None:
+            self.misses += 1
+            original = Text(text, font=font, font_size=font_size, color=color)
+            self._entries[key] = original
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return original.copy()
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Shared by every scene rendered in this process
+TEXT_CACHE = TextCache()
+
+
+def make_text(text, font="", font_size=DEFAULT_FONT_SIZE, color=WHITE):
+    """Drop-in replacement for `Text(...)` backed by the shared cache."""
+    return TEXT_CACHE.get(text, font=font, font_size=font_size, color=color)
@@ -3,11 +3,11 @@
 import os
 import json
 from ast_service import parse_code
-from code_animator_poc.engine import render_code_animation
+from code_animator_poc.keyframe_compiler import compile_keyframes
 
 # Configuration and Paths
 SOURCE_CODE_FILE = 'C:\\Users\\GuyFirst\\code-animator\\VidGenPOC\\ast_service\\code_snippets\\code_snippet2.py'  # The Python file you want to animate
-INPUT_JSON_FILE = 'code_animator_poc/assets/jsonFiles/keyframes1401.json' # Manual bridge for now
+INPUT_JSON_FILE = None # Optional hand-written keyframes (e.g. 'code_animator_poc/assets/jsonFiles/keyframes1401.json'); None = compile from the AST
 OUTPUT_VIDEO_FILE = 'code_animator_poc.mp4'
 
 def request_keyframes_from_openai(ast_json):
@@ -48,18 +48,25 @@ def main():
     # In the final version, this ast_output goes to the function below:
     # keyframes_from_ai = request_keyframes_from_openai(ast_output)
 
-    # 3. LOAD KEYFRAMES (Manual Bridge)
-    # Since you are doing this manually for now, we read the external file
-    try:
-        with open(INPUT_JSON_FILE, 'r') as f:
-            json_input = f.read()
-    except FileNotFoundError:
-        print(f"ERROR: Input file '{INPUT_JSON_FILE}' not found. Please create it manually from your AST analysis.")
-        return
+    # 3. BUILD KEYFRAMES
+    if INPUT_JSON_FILE:
+        # Hand-written keyframes take precedence over the compiler
+        try:
+            with open(INPUT_JSON_FILE, 'r') as f:
+                json_input = f.read()
+        except FileNotFoundError:
+            print(f"ERROR: Input file '{INPUT_JSON_FILE}' not found.")
+            return
+    else:
+        print("Compiling keyframes from the AST...")
+        json_input = compile_keyframes(ast_output, source_code)
 
     # 4. RENDER VIDEO
     try:
         print("Rendering video...")
+
+        # Imported only now: the rendering stack (manim, numpy, gTTS, mutagen) is slow to load
+        from code_animator_poc.engine import render_code_animation
         
         # Capture the path returned by the engine
         video_path = render_code_animation(json_input)